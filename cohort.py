@@ -0,0 +1,238 @@
+import numpy as np
+import hashlib
+import json
+import os
+import tempfile
+
+# Get the current script's directory
+script_dir = os.path.dirname(os.path.realpath(__file__))
+
+# Tasks of every subject folder, in the order of the task axis
+TASKS = ["Lectura", "Memoria", "Operaciones"]
+
+# Folder where the binary cohort cache is stored
+CACHE_FOLDER = '.cohort_cache'
+
+#------------------------------------------------------------------------------------------------------------------
+#   Cohort loader
+#------------------------------------------------------------------------------------------------------------------
+
+def scan_subjects(root = script_dir):
+    """
+        This method finds the subject folders of a cohort, which are the folders that contain a
+        connectivity matrix for every task.
+
+        param root: The folder that contains the subject folders.
+        return: The sorted list of subject folder names.
+    """
+
+    subjects = []
+    for name in sorted(os.listdir(root)):
+        folder = os.path.join(root, name)
+        if os.path.isdir(folder) and all(os.path.isfile(os.path.join(folder, task + '.txt')) for task in TASKS):
+            subjects.append(name)
+    return subjects
+
+def load_cohort(subjects = None, n = None, root = script_dir):
+    """
+        This method loads the connectivity matrices of a cohort as a single array. The matrices are
+        parsed once and stored in a bit-packed binary cache, one per number of channels. The cache is
+        read as a memory map and is rebuilt only when a source file changes.
+
+        param subjects: The subject folders to load, or None to load every subject with n channels.
+        param n: The number of channels of the subjects, or None to use the number of channels of the
+                 first subject.
+        param root: The folder that contains the subject folders.
+        return: A tuple (subjects, matrices), where matrices is a uint8 array of shape
+        (subjects, tasks, n, n), or None if the subjects do not exist or do not have n channels.
+    """
+
+    opened = open_cohort(subjects, root)
+    if opened is None:
+        return None
+
+    given = n is not None
+    if not given:
+        n = opened[0][2] if opened else 0
+
+    skipped = [item[0] for item in opened if item[2] != n]
+    if skipped and subjects is not None:
+        if given:
+            print("Warning: The subjects do not have", n, "channels.")
+        else:
+            print("Warning: The subjects do not have the same number of channels.")
+        return None
+    elif skipped:
+        print("Warning: The subjects", skipped, "do not have", n, "channels and are skipped.")
+        opened = [item for item in opened if item[2] == n]
+
+    if not opened:
+        return [], np.zeros((0, len(TASKS), n, n), dtype=np.uint8)
+
+    packed = np.array([item[1] for item in opened])
+    return [item[0] for item in opened], np.unpackbits(packed, axis=-1, count=n)
+
+def open_cohort(subjects = None, root = script_dir):
+    """
+        This method opens the bit-packed matrices of a cohort without unpacking them, so the subjects
+        can be processed one at a time. The subjects may have different numbers of channels.
+
+        param subjects: The subject folders to open, or None to open every subject.
+        param root: The folder that contains the subject folders.
+        return: A list with a tuple (subject, packed, n) per subject, where packed is a read-only memory
+        map of shape (tasks, n, ceil(n / 8)) that np.unpackbits(packed, axis=-1, count=n) unpacks, or
+        None if a subject does not exist.
+    """
+
+    all_subjects = scan_subjects(root)
+    subjects = all_subjects if subjects is None else list(subjects)
+
+    for subject in subjects:
+        if subject not in all_subjects:
+            print("Warning: Subject", subject, "is not in", root)
+            return None
+
+    if not subjects:
+        return []
+
+    stats = {subject: _file_stats(root, subject) for subject in all_subjects}
+    caches = _valid_caches(root, stats)
+
+    if not all(any(subject in cache["subjects"] for cache in caches) for subject in subjects):
+        caches = _build_caches(root, all_subjects, stats)
+
+    opened = []
+    arrays = {}
+    for subject in subjects:
+        cache = next(cache for cache in caches if subject in cache["subjects"])
+        if cache["file"] not in arrays:
+            arrays[cache["file"]] = np.load(os.path.join(root, CACHE_FOLDER, cache["file"]), mmap_mode='r')
+        opened.append((subject, arrays[cache["file"]][cache["subjects"].index(subject)], cache["n"]))
+
+    return opened
+
+def _file_stats(root, subject):
+    """
+        This method returns the modification time and size of the task files of a subject.
+    """
+
+    stats = {}
+    for task in TASKS:
+        path = os.path.join(root, subject, task + '.txt')
+        info = os.stat(path)
+        stats[task] = [info.st_mtime_ns, info.st_size]
+    return stats
+
+def _file_hash(path):
+    """
+        This method returns the SHA-1 hash of a file.
+    """
+
+    with open(path, 'rb') as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+def _valid_caches(root, stats):
+    """
+        This method returns the manifests of the caches whose source files have not changed. A file
+        whose modification time changed but whose contents are the same does not invalidate the cache.
+
+        param root: The folder that contains the subject folders.
+        param stats: The current stats of the task files of every subject.
+        return: The list of valid manifests.
+    """
+
+    folder = os.path.join(root, CACHE_FOLDER)
+    if not os.path.isdir(folder):
+        return []
+
+    caches = []
+    for name in sorted(os.listdir(folder)):
+        if not name.endswith('.json'):
+            continue
+
+        with open(os.path.join(folder, name)) as file:
+            cache = json.load(file)
+
+        valid = os.path.isfile(os.path.join(folder, cache["file"]))
+        touched = False
+        for subject in cache["subjects"]:
+            if not valid:
+                break
+            if subject not in stats:
+                valid = False
+                break
+            for task in TASKS:
+                mtime, size, digest = cache["files"][subject][task]
+                if [mtime, size] == stats[subject][task]:
+                    continue
+                if size == stats[subject][task][1] and digest == _file_hash(os.path.join(root, subject, task + '.txt')):
+                    cache["files"][subject][task][0] = stats[subject][task][0]
+                    touched = True
+                else:
+                    valid = False
+                    break
+
+        if valid:
+            if touched:
+                _write_manifest(folder, name, cache)
+            caches.append(cache)
+
+    return caches
+
+def _build_caches(root, subjects, stats):
+    """
+        This method parses the task files of every subject and writes one cache per number of channels.
+
+        param root: The folder that contains the subject folders.
+        param subjects: The subject folders.
+        param stats: The stats of the task files of every subject.
+        return: The list of manifests of the new caches.
+    """
+
+    folder = os.path.join(root, CACHE_FOLDER)
+    os.makedirs(folder, exist_ok=True)
+
+    # Group the subjects by number of channels
+    groups = {}
+    for subject in subjects:
+        matrices = [np.loadtxt(os.path.join(root, subject, task + '.txt'), dtype=np.uint8) for task in TASKS]
+        groups.setdefault(len(matrices[0]), []).append((subject, matrices))
+
+    # The caches of the current sizes are replaced below, so only the caches of sizes that are gone are
+    # removed. The temporary files are left alone, they may belong to another process writing its cache.
+    current = {'cohort_' + str(n) + extension for n in groups for extension in ('.json', '.npy')}
+    for name in os.listdir(folder):
+        if (name.endswith('.json') or name.endswith('.npy')) and name not in current:
+            try:
+                os.remove(os.path.join(folder, name))
+            except FileNotFoundError:
+                pass
+
+    caches = []
+    for n, group in sorted(groups.items()):
+        packed = np.packbits(np.array([matrices for _, matrices in group], dtype=np.uint8), axis=-1)
+        file_name = 'cohort_' + str(n) + '.npy'
+        with tempfile.NamedTemporaryFile(dir=folder, suffix='.tmp', delete=False) as file:
+            np.save(file, packed)
+        os.replace(file.name, os.path.join(folder, file_name))
+
+        cache = {"n": n,
+                 "file": file_name,
+                 "subjects": [subject for subject, _ in group],
+                 "files": {subject: {task: stats[subject][task] + [_file_hash(os.path.join(root, subject, task + '.txt'))]
+                                     for task in TASKS}
+                           for subject, _ in group}}
+        _write_manifest(folder, 'cohort_' + str(n) + '.json', cache)
+        caches.append(cache)
+
+    return caches
+
+def _write_manifest(folder, name, cache):
+    """
+        This method writes the manifest of a cache. Every writer uses its own temporary file, which replaces
+        the manifest at once, so a reader never sees a partial manifest.
+    """
+
+    with tempfile.NamedTemporaryFile('w', dir=folder, suffix='.tmp', delete=False) as file:
+        json.dump(cache, file)
+    os.replace(file.name, os.path.join(folder, name))
@@ -0,0 +1,899 @@
+import numpy as np
+
+from collections import OrderedDict
+
+from mst import kruskal, DynamicMST
+
+# Fields of the structured array returned by WeightedGraph.edge_array
+EDGE_DTYPE = np.dtype([("u", np.int32), ("v", np.int32), ("w", np.float64)])
+
+#------------------------------------------------------------------------------------------------------------------
+#   WeightedGraph class
+#------------------------------------------------------------------------------------------------------------------
+
+class WeightedGraph:
+    """
+        Class that is used to represent a weighted graph. Every vertex has a row index that is stored in a
+        dictionary, so vertex lookups do not need to scan the list of vertices.
+
+        The class supports two storage modes:
+        * The default mode uses an adjacency list and an adjacency matrix. The adjacency list is defined by a
+          dictionary, whose keys represent the vertices. For each vertex, there is a list of tuples (v,e) that
+          indicate which vertices are connected to the vertex and their corresponding weights.
+        * The compact mode stores the edges in NumPy CSR arrays (indptr, indices, weights). New edges are
+          staged per row and merged into the arrays the next time the graph is read, so building a graph
+          with thousands of edges does not copy the arrays on every insertion. Removed edges are staged
+          the same way, and skipped by the lookups until they are merged.
+
+        The graph can be directed or indirected. In the class constructor, this property is set. The
+        behaviour of some operations depends on this property.
+
+        This graph class assumes that it is possible to have multiple links between vertices.
+    """
+
+    _directed = True            # This flag indicates whether the graph is directed or indirected.
+
+    _compact = False            # This flag indicates whether the graph uses the CSR storage.
+
+    _adjacency_list = {}        # The adjacency list of the graph.
+
+    _vertices = []              # The list of vertices.
+
+    _index = {}                 # The row index of each vertex.
+
+    _edge_index = {}            # The weights of the edges from each vertex, by neighbor (list mode).
+
+    _adjacency_matrix = []      # The adjacency matrix.
+
+    _version = 0                # Counter that is increased every time the graph changes.
+
+    _tree_cache_size = 64       # Maximum number of search trees kept by the graph.
+
+
+    def __init__(self, directed:bool = False, compact:bool = False):
+        """
+            This constructor initializes an empty graph.
+
+            param directed: A flag that indicates whether the graph is directed (True) or undirected (False).
+            param compact: A flag that indicates whether the graph uses the CSR storage (True) or the
+                           adjacency list and matrix (False).
+        """
+
+        self._directed = directed
+        self._compact = compact
+        self.clear()
+
+    @classmethod
+    def from_adjacency(cls, matrix, channels, points3D, directed:bool = False, compact:bool = False, distances = None):
+        """
+            This method builds a graph from a connectivity matrix. There is an edge from channels[i] to
+            channels[j] when matrix[i][j] is 1, and its weight is the distance between the two electrodes.
+            The distances are computed once for all the pairs, unless they are given, and the edges are
+            loaded in a single pass.
+
+            param matrix: The n x n connectivity matrix.
+            param channels: The names of the n channels, which are the vertices of the graph.
+            param points3D: The n x 3 positions of the electrodes.
+            param directed: A flag that indicates whether the graph is directed (True) or undirected (False).
+            param compact: A flag that indicates whether the graph uses the CSR storage.
+            param distances: The n x n distances between the electrodes, for example the ones of
+                             montage_layout, or None to compute them from points3D.
+            return: The new graph.
+        """
+
+        graph = cls(directed, compact)
+        n = len(channels)
+        connected = np.asarray(matrix) == 1
+
+        if not directed:
+            # An undirected edge is added when either direction is in the matrix, and autocycles are dropped.
+            connected = connected | connected.T
+            np.fill_diagonal(connected, False)
+
+        distances = distance_matrix(points3D) if distances is None else distances
+        weights = np.where(connected, distances, 0.0)
+
+        graph._vertices = list(channels)
+        graph._index = {v: i for i, v in enumerate(graph._vertices)}
+        rows, cols = np.nonzero(connected)
+
+        if compact:
+            graph._set_csr(rows, cols, weights[rows, cols], n)
+
+        else:
+            graph._edge_index = {v: {} for v in graph._vertices}
+            for i, j, w in zip(rows.tolist(), cols.tolist(), weights[rows, cols].tolist()):
+                graph._edge_index[graph._vertices[i]][graph._vertices[j]] = [w]
+
+            graph._adjacency_matrix = weights.tolist()
+            graph._adjacency_list = {v: [] for v in graph._vertices}
+            for i, j, w in zip(rows.tolist(), cols.tolist(), weights[rows, cols].tolist()):
+                graph._adjacency_list[graph._vertices[i]].append((graph._vertices[j], w))
+
+        graph._components_stale = True
+        graph.set_coordinates(points3D)
+        graph._touch()
+        return graph
+
+    def clear(self):
+        """
+            This method clears the graph.
+        """
+        self._vertices = []
+        self._index = {}
+        self._adjacency_list = {}
+        self._adjacency_matrix = []
+
+        # Weights of the edges from each vertex, as v1 -> {v2: [weights]}, in the default mode. The compact
+        # mode looks the edges up in the CSR arrays instead.
+        self._edge_index = {}
+
+        # CSR arrays, the edges of row i are indices[indptr[i]:indptr[i+1]].
+        self._indptr = np.zeros(1, dtype=np.int64)
+        self._indices = np.zeros(0, dtype=np.int32)
+        self._weights = np.zeros(0, dtype=np.float64)
+
+        # Edges that have not been merged into the CSR arrays yet, as row -> [(column, weight)].
+        self._pending = {}
+
+        # Edges of the CSR arrays that were removed but are still in the arrays, as row -> {(column, weight)}.
+        self._removed = {}
+
+        # Columns and weights of the CSR arrays with every row sorted by column, built by _csr_weights.
+        self._sorted_csr = None
+
+        # CSR arrays built from the adjacency list in the default mode.
+        self._csr = None
+
+        # CSR arrays of the graph and of the reversed graph as Python lists, built by csr_lists.
+        self._csr_lists = None
+        self._reverse_csr_lists = None
+
+        # Structured array of edges built by edge_array.
+        self._edge_array = None
+
+        # Union-find forest of the connected components, as parent and size per row index. It is joined
+        # by add_edge and rebuilt from the edges when it is stale, for example after a removal.
+        self._component_parent = []
+        self._component_size = []
+        self._components_stale = False
+
+        # 3D position of each vertex, one row per vertex index.
+        self._coordinates = None
+
+        # Search trees of the current version, as (version, algorithm, source) -> tree, in LRU order.
+        self._tree_cache = OrderedDict()
+
+        # Minimum spanning tree that is updated with the edges, built by dynamic_mst.
+        self._dynamic_mst = None
+
+        # Distances between all the vertices that are updated with the edges, built by dynamic_distances.
+        self._dynamic_distances = None
+        self._version += 1
+
+    def is_directed(self) -> bool:
+        """
+            This method returns whether the graph is directed.
+        """
+        return self._directed
+
+    def number_of_vertices(self):
+        """
+            This method returns the number of vertices of the graph.
+        """
+        return len(self._vertices)
+
+    def vertices(self):
+        """
+            This method returns the list of vertices.
+        """
+        return list(self._vertices)
+
+    def vertex_index(self, v):
+        """
+            This method returns the row index of a vertex, or None if the vertex is not in the graph.
+
+            param v: The vertex whose index is to be returned.
+        """
+        return self._index.get(v)
+
+    def edges(self):
+        """
+            This method returns the list of edges. In undirected graphs every edge is returned once, from
+            the vertex with the lower row index.
+        """
+
+        edges = self.edge_array()
+        return [(self._vertices[i], self._vertices[j], w) for i, j, w in
+                zip(edges["u"].tolist(), edges["v"].tolist(), edges["w"].tolist())]
+
+    def edge_array(self):
+        """
+            This method returns the edges of the graph as a NumPy structured array with the fields u and v,
+            which are the row indices of the end vertices, and w, which is the weight. In undirected graphs
+            every edge is stored once with u < v. The array is built once per version of the graph and is
+            returned as a read-only view, so it must not be modified.
+
+            return: The structured array of edges, in the order of the rows of csr().
+        """
+
+        if self._edge_array is None:
+            indptr, indices, weights = self.csr()
+            rows = np.repeat(np.arange(len(self._vertices), dtype=np.int32), np.diff(indptr))
+            keep = slice(None) if self._directed else rows < indices
+
+            edges = np.empty(len(rows[keep]), dtype=EDGE_DTYPE)
+            edges["u"] = rows[keep]
+            edges["v"] = indices[keep]
+            edges["w"] = weights[keep]
+            edges.flags.writeable = False
+            self._edge_array = edges
+
+        return self._edge_array.view()
+
+    def add_vertex(self, v):
+        """
+            Add vertex to the graph.
+
+            param v: The new vertex to be added to the graph.
+        """
+
+        if v in self._index:
+            print("Warning: Vertex ", v, " already exists.")
+
+        else:
+            self._index[v] = len(self._vertices)
+            self._vertices.append(v)
+            self._component_parent.append(len(self._component_parent))
+            self._component_size.append(1)
+
+            if self._coordinates is not None:
+                # The position of the new vertex is unknown until set_coordinates is called again.
+                self._coordinates = np.vstack((self._coordinates, np.full((1, self._coordinates.shape[1]), np.nan)))
+
+            if not self._compact:
+                self._adjacency_list[v] = []
+                self._edge_index[v] = {}
+                n = len(self._vertices)
+
+                if n > 1:
+                    for vertex in self._adjacency_matrix:
+                        vertex.append(0)
+
+                self._adjacency_matrix.append(n*[0])
+
+            if self._dynamic_mst is not None:
+                self._dynamic_mst.add_vertex()
+            if self._dynamic_distances is not None:
+                self._dynamic_distances.add_vertex()
+
+            self._touch()
+
+    def remove_vertex(self, v):
+        """
+            Remove vertex from the graph.
+
+            param v: The vertex to be removed from the graph.
+        """
+
+        if v not in self._index:
+            print("Warning: Vertex ", v, " is not in graph.")
+
+        else:
+            index = self._index[v]
+
+            if self._compact:
+                # Drop the edges where the vertex is an end point and shift the following rows up.
+                indptr, indices, weights = self.csr()
+                rows = np.repeat(np.arange(len(self._vertices)), np.diff(indptr))
+                keep = (rows != index) & (indices != index)
+                rows = rows[keep]
+                rows[rows > index] -= 1
+                cols = indices[keep]
+                cols[cols > index] -= 1
+                self._set_csr(rows, cols, weights[keep], len(self._vertices) - 1)
+
+            else:
+                for row in self._adjacency_matrix:
+                    row.pop(index)
+
+                self._adjacency_matrix.pop(index)
+
+                # Remove vertex from adjacency list.
+                del self._adjacency_list[v]
+
+                # Remove edges where the vertex is an end point.
+                for vertex in self._adjacency_list:
+                    self._adjacency_list[vertex] = [edge for edge in self._adjacency_list[vertex] if edge[0] != v]
+
+                del self._edge_index[v]
+                for neighbors in self._edge_index.values():
+                    neighbors.pop(v, None)
+
+            self._vertices.pop(index)
+            if self._coordinates is not None:
+                self._coordinates = np.delete(self._coordinates, index, axis=0)
+            self._index = {vertex: i for i, vertex in enumerate(self._vertices)}
+
+            # The row indices changed, so the minimum spanning tree, the distances and the components are
+            # computed again when they are requested.
+            self._dynamic_mst = None
+            self._dynamic_distances = None
+            self._components_stale = True
+            self._touch()
+
+    def add_edge(self, v1, v2, e = 0):
+        """
+            Add edge to the graph. The edge is defined by two vertices v1 and v2, and
+            the weigth e of the edge.
+
+            param v1: The start vertex of the new edge.
+            param v2: The end vertex of the new edge.
+            param e: The weight of the new edge.
+        """
+
+        if v1 not in self._index:
+            # The start vertex does not exist.
+            print("Warning: Vertex ", v1, " does not exist.")
+
+        elif v2 not in self._index:
+            # The end vertex does not exist.
+            print("Warning: Vertex ", v2, " does not exist.")
+
+        elif not self._directed and v1 == v2:
+            # The graph is undirected, so it is no allowed to have autocycles.
+            print("Warning: An undirected graph cannot have autocycles.")
+
+        elif self._has_edge(v1, v2, e):
+            # The edge is already in graph.
+            print("Warning: The edge (", v1, "," ,v2, ",", e, ") already exists.")
+
+        elif self._compact:
+            index1 = self._index[v1]
+            index2 = self._index[v2]
+            self._pending.setdefault(index1, []).append((index2, e))
+            if not self._directed:
+                self._pending.setdefault(index2, []).append((index1, e))
+            self._join_components(index1, index2)
+            if self._dynamic_mst is not None:
+                self._dynamic_mst.insert(index1, index2, e)
+            if self._dynamic_distances is not None:
+                self._dynamic_distances.insert(index1, index2, e)
+            self._touch()
+
+        else:
+            self._index_edge(v1, v2, e)
+            self._adjacency_list[v1].append((v2, e))
+            index1 = self._index[v1]
+            index2 = self._index[v2]
+            self._adjacency_matrix[index1][index2] = e
+            if not self._directed:
+                self._adjacency_list[v2].append((v1, e))
+                self._adjacency_matrix[index2][index1] = e
+            self._join_components(index1, index2)
+            if self._dynamic_mst is not None:
+                self._dynamic_mst.insert(index1, index2, e)
+            if self._dynamic_distances is not None:
+                self._dynamic_distances.insert(index1, index2, e)
+            self._touch()
+
+    def remove_edge(self, v1, v2, e):
+        """
+            Remove edge from the graph.
+
+            param v1: The start vertex of the edge to be removed.
+            param v2: The end vertex of the edge to be removed.
+            param e: The weight of the edge to be removed.
+        """
+
+        if v1 not in self._index:
+            # v1 is not a vertex of the graph
+            print("Warning: Vertex ", v1, " does not exist.")
+
+        elif v2 not in self._index:
+            # v2 is not a vertex of the graph
+            print("Warning: Vertex ", v2, " does not exist.")
+
+        elif not self._has_edge(v1, v2, e):
+            # The edge is not in the graph, so there is nothing to remove.
+            pass
+
+        elif self._compact:
+            index1 = self._index[v1]
+            index2 = self._index[v2]
+            self._stage_removal(index1, index2, e)
+            if not self._directed:
+                self._stage_removal(index2, index1, e)
+            self._components_stale = True
+            if self._dynamic_mst is not None:
+                self._dynamic_mst.delete(index1, index2, e)
+            if self._dynamic_distances is not None:
+                self._dynamic_distances.delete(index1, index2, e)
+            self._touch()
+
+        else:
+            self._unindex_edge(v1, v2, e)
+            index1 = self._index[v1]
+            index2 = self._index[v2]
+
+            # The matrix keeps the last edge that is left between the two vertices.
+            weights = self._edge_index[v1].get(v2)
+            self._adjacency_matrix[index1][index2] = weights[-1] if weights else 0
+            self._adjacency_list[v1].remove((v2, e))
+
+            if not self._directed:
+                self._adjacency_matrix[index2][index1] = weights[-1] if weights else 0
+                self._adjacency_list[v2].remove((v1, e))
+            self._components_stale = True
+            if self._dynamic_mst is not None:
+                self._dynamic_mst.delete(index1, index2, e)
+            if self._dynamic_distances is not None:
+                self._dynamic_distances.delete(index1, index2, e)
+            self._touch()
+
+    def adjacent_vertices(self, v):
+        """
+            Adjacent vertices of a vertex.
+
+            param v: The vertex whose adjacent vertices are to be returned.
+            return: The list of adjacent vertices of v.
+        """
+
+        if v not in self._index:
+            # The vertex is not in the graph.
+            print("Warning: Vertex ", v, " does not exist.")
+            return []
+
+        elif self._compact:
+            return [(self._vertices[j], w) for j, w in self._row_edges(self._index[v])]
+
+        else:
+            return self._adjacency_list[v]
+
+    def is_adjacent(self, v1, v2) -> bool:
+        """
+            This method indicates whether vertex v2 is adjacent to vertex v1.
+
+            param v1: The start vertex of the relation to test.
+            param v2: The end vertex of the relation to test.
+            return: True if v2 is adjacent to v1, False otherwise.
+        """
+
+        if v1 not in self._index:
+            # v1 is not a vertex of the graph
+            print("Warning: Vertex ", v1, " does not exist.")
+            return False
+
+        elif v2 not in self._index:
+            # v2 is not a vertex of the graph
+            print("Warning: Vertex ", v2, " does not exist.")
+            return False
+
+        elif self._compact:
+            return len(self._csr_weights(self._index[v1], self._index[v2])) > 0
+
+        else:
+            return v2 in self._edge_index[v1]
+
+    def csr(self):
+        """
+            This method returns the edges of the graph in CSR format. The edges of the vertex with row index i
+            are indices[indptr[i]:indptr[i+1]], and their weights are stored at the same positions of weights.
+
+            return: A tuple (indptr, indices, weights) of NumPy arrays.
+        """
+
+        if self._compact:
+            if self._pending or self._removed or len(self._indptr) != len(self._vertices) + 1:
+                self._merge_pending()
+            return self._indptr, self._indices, self._weights
+
+        if self._csr is None:
+            n = len(self._vertices)
+            indptr = np.zeros(n + 1, dtype=np.int64)
+            indices = []
+            weights = []
+            for i, v in enumerate(self._vertices):
+                for edge in self._adjacency_list[v]:
+                    indices.append(self._index[edge[0]])
+                    weights.append(edge[1])
+                indptr[i+1] = len(indices)
+            self._csr = (indptr, np.array(indices, dtype=np.int32), np.array(weights, dtype=np.float64))
+        return self._csr
+
+    def csr_lists(self, reverse = False):
+        """
+            This method returns the CSR arrays of the graph as Python lists, which are faster than NumPy
+            arrays when they are read one element at a time. The lists are built once per version of the
+            graph and shared by every search, so they must not be modified.
+
+            param reverse: A flag that indicates whether the lists of the reversed graph are returned, where
+                           the edges of vertex i are the edges that end at i. An undirected graph is its own
+                           reverse.
+            return: A tuple (indptr, indices, weights) of lists.
+        """
+
+        if reverse and self._directed:
+            if self._reverse_csr_lists is None:
+                indptr, indices, weights = self.csr()
+                n = len(self._vertices)
+                rows = np.repeat(np.arange(n), np.diff(indptr))
+                order = np.argsort(indices, kind='stable')
+                reverse_indptr = np.zeros(n + 1, dtype=np.int64)
+                np.cumsum(np.bincount(indices, minlength=n), out=reverse_indptr[1:])
+                self._reverse_csr_lists = (reverse_indptr.tolist(), rows[order].tolist(), weights[order].tolist())
+            return self._reverse_csr_lists
+
+        if self._csr_lists is None:
+            indptr, indices, weights = self.csr()
+            self._csr_lists = (indptr.tolist(), indices.tolist(), weights.tolist())
+        return self._csr_lists
+
+    def set_coordinates(self, points):
+        """
+            This method stores the position of every vertex of the graph, for example the 3D position of the
+            electrodes. The positions are used by the searches that need a geometric heuristic.
+
+            param points: A sequence with one point per vertex, in the same order as vertices().
+        """
+
+        points = np.array(points, dtype=np.float64)
+
+        if len(points) != len(self._vertices):
+            print("Warning: Expected ", len(self._vertices), " points, but got ", len(points), ".")
+
+        else:
+            self._coordinates = points
+
+    def coordinates(self):
+        """
+            This method returns the position of every vertex of the graph, or None if the positions have not
+            been set.
+        """
+        return self._coordinates
+
+    def adjacency_matrix(self):
+        """
+            This method returns the adjacency matrix of the graph as a NumPy array. Missing edges are
+            represented with 0.
+        """
+
+        if not self._compact:
+            return np.array(self._adjacency_matrix, dtype=np.float64).reshape(len(self._vertices), len(self._vertices))
+
+        n = len(self._vertices)
+        indptr, indices, weights = self.csr()
+        matrix = np.zeros((n, n), dtype=np.float64)
+        matrix[np.repeat(np.arange(n), np.diff(indptr)), indices] = weights
+        return matrix
+
+    def version(self):
+        """
+            This method returns the version of the graph. The version changes every time a vertex or an edge
+            is added or removed, so results computed from the graph can be tagged with it.
+        """
+        return self._version
+
+    def cached_tree(self, algorithm, source):
+        """
+            This method returns a search tree that was stored with cache_tree for the current version of the
+            graph, or None if there is no such tree.
+
+            param algorithm: The name of the search algorithm that built the tree.
+            param source: The root vertex of the tree.
+        """
+
+        key = (self._version, algorithm, source)
+        tree = self._tree_cache.get(key)
+        if tree is not None:
+            self._tree_cache.move_to_end(key)
+        return tree
+
+    def cache_tree(self, algorithm, source, tree):
+        """
+            This method stores a search tree for the current version of the graph. When the cache is full,
+            the least recently used tree is dropped.
+
+            param algorithm: The name of the search algorithm that built the tree.
+            param source: The root vertex of the tree.
+            param tree: The search tree.
+        """
+
+        self._tree_cache[(self._version, algorithm, source)] = tree
+        self._tree_cache.move_to_end((self._version, algorithm, source))
+        if len(self._tree_cache) > self._tree_cache_size:
+            self._tree_cache.popitem(last=False)
+
+    def _touch(self):
+        """
+            This method records a change of the graph. The version is increased and the data derived from
+            the previous version is dropped.
+        """
+
+        self._version += 1
+        self._csr = None
+        self._csr_lists = None
+        self._reverse_csr_lists = None
+        self._edge_array = None
+        self._tree_cache.clear()
+
+    def _find_component(self, i):
+        """
+            This method returns the root of the union-find tree of the vertex with row index i. The forest is
+            rebuilt from the edges first if it is stale.
+        """
+
+        if self._components_stale:
+            n = len(self._vertices)
+            self._component_parent = list(range(n))
+            self._component_size = [1] * n
+            self._components_stale = False
+            edges = self.edge_array()
+            for u, v in zip(edges["u"].tolist(), edges["v"].tolist()):
+                self._join_components(u, v)
+
+        parent = self._component_parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def _join_components(self, i, j):
+        """
+            This method joins the components of the vertices with row indices i and j. Nothing is done while
+            the forest is stale, because it is rebuilt from the edges.
+        """
+
+        if self._components_stale:
+            return
+
+        i = self._find_component(i)
+        j = self._find_component(j)
+        if i == j:
+            return
+
+        # Join the smaller tree to the larger one
+        if self._component_size[i] < self._component_size[j]:
+            i, j = j, i
+        self._component_parent[j] = i
+        self._component_size[i] += self._component_size[j]
+
+    def _has_edge(self, v1, v2, e):
+        """
+            This method indicates whether the edge (v1, v2, e) is already in the graph.
+        """
+
+        if self._compact:
+            return e in self._csr_weights(self._index[v1], self._index[v2])
+        return e in self._edge_index[v1].get(v2, ())
+
+    def _csr_weights(self, i, j):
+        """
+            This method returns the weights of the edges from row i to column j in the compact mode, without
+            merging the staged edges and removals. The columns of each row are sorted once per change of the CSR arrays,
+            so the edges of a row are found by binary search.
+        """
+
+        weights = [w for col, w in self._pending.get(i, ()) if col == j]
+
+        if i + 1 < len(self._indptr):
+            if self._sorted_csr is None:
+                rows = np.repeat(np.arange(len(self._indptr) - 1), np.diff(self._indptr))
+                order = np.lexsort((self._indices, rows))
+                self._sorted_csr = (self._indices[order], self._weights[order])
+
+            columns, sorted_weights = self._sorted_csr
+            start, end = self._indptr[i], self._indptr[i+1]
+            low = start + np.searchsorted(columns[start:end], j, side='left')
+            high = start + np.searchsorted(columns[start:end], j, side='right')
+            removed = self._removed.get(i, ())
+            weights.extend(w for w in sorted_weights[low:high].tolist() if (j, w) not in removed)
+
+        return weights
+
+    def _index_edge(self, v1, v2, e):
+        """
+            This method adds the edge (v1, v2, e) to the edge index.
+        """
+
+        self._edge_index[v1].setdefault(v2, []).append(e)
+        if not self._directed:
+            self._edge_index[v2].setdefault(v1, []).append(e)
+
+    def _unindex_edge(self, v1, v2, e):
+        """
+            This method removes the edge (v1, v2, e) from the edge index.
+        """
+
+        for a, b in ((v1, v2), (v2, v1)) if not self._directed else ((v1, v2),):
+            weights = self._edge_index[a][b]
+            weights.remove(e)
+            if not weights:
+                del self._edge_index[a][b]
+
+    def _row_edges(self, i):
+        """
+            This method returns the edges of the vertex with row index i as a list of (column, weight),
+            without merging the staged edges and removals of the compact mode. The edges are in the order
+            they have after the merge.
+        """
+
+        if not self._compact:
+            return [(self._index[edge[0]], edge[1]) for edge in self._adjacency_list[self._vertices[i]]]
+
+        edges = []
+        if i + 1 < len(self._indptr):
+            start, end = self._indptr[i], self._indptr[i+1]
+            removed = self._removed.get(i, ())
+            edges = [edge for edge in zip(self._indices[start:end].tolist(), self._weights[start:end].tolist())
+                     if edge not in removed]
+        edges.extend(self._pending.get(i, ()))
+        return edges
+
+    def _stage_removal(self, i, j, e):
+        """
+            This method removes the edge from row i to column j with weight e in the compact mode. A staged
+            edge is dropped from the staged edges, and an edge of the CSR arrays is marked as removed until
+            the next merge.
+        """
+
+        edges = self._pending.get(i)
+        if edges and (j, e) in edges:
+            edges.remove((j, e))
+            if not edges:
+                del self._pending[i]
+        else:
+            self._removed.setdefault(i, set()).add((j, e))
+
+    def _merge_pending(self):
+        """
+            This method merges the staged edges and removals into the CSR arrays of the compact mode.
+        """
+
+        n = len(self._vertices)
+        old_rows = np.repeat(np.arange(len(self._indptr) - 1), np.diff(self._indptr))
+        old_cols = self._indices
+        old_weights = self._weights
+        if self._removed:
+            keep = np.ones(len(old_cols), dtype=bool)
+            for row, removed in self._removed.items():
+                start, end = self._indptr[row], self._indptr[row+1]
+                edges = zip(old_cols[start:end].tolist(), old_weights[start:end].tolist())
+                keep[start:end] = [edge not in removed for edge in edges]
+            old_rows, old_cols, old_weights = old_rows[keep], old_cols[keep], old_weights[keep]
+        new_rows = []
+        new_cols = []
+        new_weights = []
+        for row, edges in self._pending.items():
+            for col, w in edges:
+                new_rows.append(row)
+                new_cols.append(col)
+                new_weights.append(w)
+
+        rows = np.concatenate((old_rows, np.array(new_rows, dtype=np.int64)))
+        cols = np.concatenate((old_cols, np.array(new_cols, dtype=np.int32)))
+        weights = np.concatenate((old_weights, np.array(new_weights, dtype=np.float64)))
+        self._set_csr(rows, cols, weights, n)
+        self._pending = {}
+        self._removed = {}
+
+    def _set_csr(self, rows, cols, weights, n):
+        """
+            This method rebuilds the CSR arrays of the compact mode from a list of edges. The edges keep their
+            relative order inside each row.
+
+            param rows: The start vertex index of each edge.
+            param cols: The end vertex index of each edge.
+            param weights: The weight of each edge.
+            param n: The number of vertices.
+        """
+
+        order = np.argsort(rows, kind='stable')
+        self._sorted_csr = None
+        self._indices = np.ascontiguousarray(cols[order], dtype=np.int32)
+        self._weights = np.ascontiguousarray(weights[order], dtype=np.float64)
+        self._indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=self._indptr[1:])
+
+    def print_graph(self):
+        """
+            This method shows the edges of the graph.
+        """
+
+        for vertex in self._vertices:
+            for edges in self.adjacent_vertices(vertex):
+                print(vertex, " -> ", edges[0], " edge weight: ", edges[1])
+
+    def KruskalMST(self):
+        """
+            This method returns the minimum spanning tree of the graph using Kruskal's algorithm. The graph
+            is not modified, so the method can be called more than once.
+
+            return: The list of edges (v1, v2, e) of the minimum spanning tree, in the order they were added.
+        """
+
+        u, v, w = kruskal(self)
+        return [(self._vertices[i], self._vertices[j], e) for i, j, e in zip(u.tolist(), v.tolist(), w.tolist())]
+
+    def dynamic_mst(self):
+        """
+            This method returns the minimum spanning tree of the graph as a DynamicMST object. The tree is
+            built the first time, and then add_edge and remove_edge update it in place, so it does not have
+            to be computed again after every change.
+
+            return: The DynamicMST of the graph, or None if the graph is directed.
+        """
+
+        if self._directed:
+            print("Warning: The minimum spanning tree is only kept for undirected graphs.")
+            return None
+
+        if self._dynamic_mst is None:
+            self._dynamic_mst = DynamicMST(self)
+        return self._dynamic_mst
+
+    def dynamic_distances(self):
+        """
+            This method returns the length of the shortest paths between all the vertices of the graph as a
+            DynamicDistances object. The distances are computed the first time, and then add_edge and
+            remove_edge update them in place, so they do not have to be computed again after every change.
+
+            return: The DynamicDistances of the graph.
+        """
+
+        # The search module imports this one, so it is imported when the distances are first requested.
+        from search import DynamicDistances
+
+        if self._dynamic_distances is None:
+            self._dynamic_distances = DynamicDistances(self)
+        return self._dynamic_distances
+
+    def components(self):
+        """
+            This method returns the connected components of the graph. In directed graphs, the direction of
+            the edges is ignored.
+
+            return: A tuple (labels, sizes) of NumPy arrays. labels[i] is the component of the vertex with
+            row index i, numbered from 0 in the order of the lowest row index of each component, and
+            sizes[k] is the number of vertices of component k.
+        """
+
+        roots = np.array([self._find_component(i) for i in range(len(self._vertices))], dtype=np.int64)
+        _, first, labels, sizes = np.unique(roots, return_index=True, return_inverse=True, return_counts=True)
+
+        # Number the components by their first vertex
+        order = np.argsort(first)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        return rank[labels], sizes[order]
+
+    def same_component(self, v1, v2) -> bool:
+        """
+            This method indicates whether two vertices are in the same connected component. If they are not,
+            there is no path between them. In directed graphs, the direction of the edges is ignored, so the
+            vertices may be in the same component even if there is no path.
+
+            param v1: The first vertex.
+            param v2: The second vertex.
+            return: True if both vertices are in the same component, False otherwise or if a vertex does not
+            exist.
+        """
+
+        if v1 not in self._index:
+            # v1 is not a vertex of the graph
+            print("Warning: Vertex ", v1, " does not exist.")
+            return False
+
+        elif v2 not in self._index:
+            # v2 is not a vertex of the graph
+            print("Warning: Vertex ", v2, " does not exist.")
+            return False
+
+        return self._find_component(self._index[v1]) == self._find_component(self._index[v2])
+
+
+# Method that calculates the distance between every pair of points
+def distance_matrix(points):
+    points = np.asarray(points, dtype=np.float64)
+    difference = points[:, None, :] - points[None, :, :]
+    return np.sqrt(np.sum(difference ** 2, axis=-1))
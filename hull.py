@@ -0,0 +1,102 @@
+import numpy as np
+
+#------------------------------------------------------------------------------------------------------------------
+#   Convex hull
+#------------------------------------------------------------------------------------------------------------------
+
+def convex_hull(points):
+    """
+        This method finds the convex hull of a set of 2D points with Andrew's monotone chain algorithm.
+        Points that lie on an edge of the hull are not part of it.
+
+        param points: A sequence of n (x, y) points.
+        return: A tuple (indices, area, perimeter), where indices is the array of indices of the points of
+        the hull in counterclockwise order, starting from the point with the lowest x (and lowest y).
+    """
+
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    hulls, areas, perimeters = convex_hull_batch(points, np.ones((1, len(points)), dtype=bool))
+    return hulls[0], areas[0], perimeters[0]
+
+def convex_hull_batch(points, masks):
+    """
+        This method finds the convex hulls of many subsets of the same 2D points, for example the vertices
+        of the minimum spanning trees of every task of a cohort. The points are sorted once, and the
+        monotone chains of all the subsets are built together, with the cross products of every subset
+        computed by one NumPy operation.
+
+        param points: An array of n (x, y) points.
+        param masks: A boolean array of shape (subsets, n), where masks[b][i] indicates whether point i is
+        in subset b.
+        return: A tuple (hulls, areas, perimeters), where hulls is a list with the array of point indices
+        of each hull, in counterclockwise order, and areas and perimeters are arrays with one value per
+        subset.
+    """
+
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    masks = np.asarray(masks, dtype=bool)
+    masks = masks.reshape(len(masks) if masks.ndim > 1 else 1, len(points))
+
+    # Sort the points by x and then by y
+    order = np.lexsort((points[:, 1], points[:, 0]))
+
+    lower, lower_size = _monotone_chain(points, order, masks)
+    upper, upper_size = _monotone_chain(points, order[::-1], masks)
+
+    hulls = []
+    for b in range(len(masks)):
+        if lower_size[b] <= 1:
+            hull = lower[b, :lower_size[b]]
+        else:
+            # The last point of each chain is the first point of the other one
+            hull = np.concatenate((lower[b, :lower_size[b] - 1], upper[b, :upper_size[b] - 1]))
+        hulls.append(hull)
+
+    areas = np.zeros(len(masks))
+    perimeters = np.zeros(len(masks))
+    for b, hull in enumerate(hulls):
+        if len(hull) > 1:
+            x, y = points[hull, 0], points[hull, 1]
+            next_x, next_y = np.roll(x, -1), np.roll(y, -1)
+            areas[b] = abs(np.sum(x * next_y - next_x * y)) / 2
+            perimeters[b] = np.sum(np.hypot(next_x - x, next_y - y))
+
+    return hulls, areas, perimeters
+
+def _monotone_chain(points, order, masks):
+    """
+        This method builds one monotone chain (the lower one when the points are sorted from left to right)
+        of every subset at the same time.
+
+        param points: The array of points.
+        param order: The indices of the points in the order they are visited.
+        param masks: The boolean array of subsets.
+        return: A tuple (chains, sizes), where chains[b][:sizes[b]] are the indices of the chain of
+        subset b.
+    """
+
+    subsets = len(masks)
+    chains = np.zeros((subsets, len(order) + 1), dtype=np.int64)
+    sizes = np.zeros(subsets, dtype=np.int64)
+    rows = np.arange(subsets)
+
+    for p in order.tolist():
+        active = rows[masks[:, p]]
+
+        # Remove the last point of the chain while it does not make a counterclockwise turn
+        while len(active):
+            turning = active[sizes[active] >= 2]
+            if not len(turning):
+                break
+            a = points[chains[turning, sizes[turning] - 2]]
+            o = points[chains[turning, sizes[turning] - 1]]
+            cross = (o[:, 0] - a[:, 0]) * (points[p, 1] - a[:, 1]) - (o[:, 1] - a[:, 1]) * (points[p, 0] - a[:, 0])
+            popped = turning[cross <= 0]
+            if not len(popped):
+                break
+            sizes[popped] -= 1
+
+        chains[active, sizes[active]] = p
+        sizes[active] += 1
+
+    return chains, sizes
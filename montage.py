@@ -0,0 +1,180 @@
+import numpy as np
+import hashlib
+import os
+import tempfile
+import zipfile
+
+from graph import distance_matrix
+from voronoi import voronoi_cells
+
+# Get the current script's directory
+script_dir = os.path.dirname(os.path.realpath(__file__))
+
+# Folder with the coordinate files of the montages, one montage_<n>.txt file per number of channels.
+# Every line of a file has the name of a channel and the x, y, z position of its electrode.
+MONTAGE_FOLDER = 'montages'
+
+# Folder where the layout of every montage is stored
+CACHE_FOLDER = '.montage_cache'
+
+# Layouts that were already loaded by this process, by number of channels
+_layouts = {}
+
+#------------------------------------------------------------------------------------------------------------------
+#   Electrode montages
+#------------------------------------------------------------------------------------------------------------------
+
+def available_montages(root = script_dir):
+    """
+        This method finds the montages that have a coordinate file.
+
+        param root: The folder that contains the montage folder.
+        return: The sorted list of numbers of channels of the montages.
+    """
+
+    folder = os.path.join(root, MONTAGE_FOLDER)
+    if not os.path.isdir(folder):
+        return []
+
+    sizes = []
+    for name in os.listdir(folder):
+        size = name[len('montage_'):-len('.txt')]
+        if name.startswith('montage_') and name.endswith('.txt') and size.isdigit():
+            sizes.append(int(size))
+    return sorted(sizes)
+
+def get_montage(n, root = script_dir):
+    """
+        This method returns the electrode montage with n channels.
+
+        param n: The number of channels.
+        param root: The folder that contains the montage folder.
+        return: A tuple (channels, points3D, points2D), or None if there is no montage with n channels.
+    """
+
+    layout = montage_layout(n, root)
+    if layout is None:
+        return None
+    return list(layout["channels"]), layout["points3D"].copy(), layout["points2D"].copy()
+
+def montage_layout(n, root = script_dir):
+    """
+        This method returns everything that only depends on the positions of the electrodes of a montage:
+        the 2D projection, the distances between the electrodes and the Voronoi cells. The layout is
+        computed once and stored in a cache file, which is rebuilt only when the coordinate file changes,
+        and every process keeps the layouts it has loaded. The arrays are shared, so they are read-only.
+
+        param n: The number of channels.
+        param root: The folder that contains the montage folder.
+        return: A dictionary with the list of channels, the channel -> row index map, the n x 3 points3D
+        and n x 2 points2D arrays, the n x n distance matrix and the list of Voronoi cells, or None if
+        there is no montage with n channels.
+    """
+
+    key = (os.path.realpath(root), n)
+    if key not in _layouts:
+        path = os.path.join(root, MONTAGE_FOLDER, 'montage_' + str(n) + '.txt')
+        if not os.path.isfile(path):
+            print("Warning: There is no montage with", n, "channels.")
+            return None
+
+        with open(path, 'rb') as file:
+            source = file.read()
+        digest = hashlib.sha1(source).hexdigest()
+
+        layout = _read_layout(root, n, digest)
+        if layout is None:
+            layout = _build_layout(source)
+            if len(layout["channels"]) != n:
+                print("Warning: The montage file", path, "does not have", n, "channels.")
+                return None
+            _write_layout(root, n, digest, layout)
+
+        for name in ("points3D", "points2D", "distances"):
+            layout[name].flags.writeable = False
+        for cell in layout["cells"]:
+            cell.flags.writeable = False
+        layout["index"] = {channel: i for i, channel in enumerate(layout["channels"])}
+        _layouts[key] = layout
+
+    return _layouts[key]
+
+# Method that projects the electrode positions onto the plane of the plots
+def project(points3D):
+    points3D = np.asarray(points3D)
+    r = np.sqrt(points3D[:, 0] ** 2 + points3D[:, 1] ** 2 + points3D[:, 2] ** 2)
+    x = r * points3D[:, 0]
+    y = r * points3D[:, 1]
+    return np.column_stack((x, y))
+
+def _build_layout(source):
+    """
+        This method parses a coordinate file and computes the layout of its montage.
+    """
+
+    channels = []
+    points3D = []
+    for line in source.decode().splitlines():
+        if line.strip():
+            name, x, y, z = line.split()
+            channels.append(name)
+            points3D.append([float(x), float(y), float(z)])
+
+    points3D = np.array(points3D, dtype=np.float64).reshape(-1, 3)
+    points2D = project(points3D)
+    return {"channels": channels,
+            "points3D": points3D,
+            "points2D": points2D,
+            "distances": distance_matrix(points3D),
+            "cells": voronoi_cells(points2D)}
+
+def _read_layout(root, n, digest):
+    """
+        This method reads the cached layout of a montage, or returns None if there is no cache, it was
+        built from a different coordinate file or it cannot be read.
+    """
+
+    path = os.path.join(root, CACHE_FOLDER, 'montage_' + str(n) + '.npz')
+    if not os.path.isfile(path):
+        return None
+
+    try:
+        with np.load(path) as cache:
+            if str(cache["digest"]) != digest:
+                return None
+
+            # The cells are stored one after the other, cells[i] is vertices[offsets[i]:offsets[i+1]]
+            offsets = cache["offsets"].tolist()
+            vertices = cache["vertices"]
+            return {"channels": cache["channels"].tolist(),
+                    "points3D": cache["points3D"],
+                    "points2D": cache["points2D"],
+                    "distances": cache["distances"],
+                    "cells": [vertices[offsets[i]:offsets[i+1]] for i in range(len(offsets) - 1)]}
+
+    except (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile):
+        # A damaged cache is built again
+        return None
+
+def _write_layout(root, n, digest, layout):
+    """
+        This method writes the cached layout of a montage. Every writer uses its own temporary file, which
+        replaces the cache at once, so processes that build the same layout at the same time do not mix
+        their files and a reader never sees a partial cache.
+    """
+
+    folder = os.path.join(root, CACHE_FOLDER)
+    os.makedirs(folder, exist_ok=True)
+
+    offsets = np.cumsum([0] + [len(cell) for cell in layout["cells"]])
+    path = os.path.join(folder, 'montage_' + str(n) + '.npz')
+    with tempfile.NamedTemporaryFile(dir=folder, suffix='.tmp', delete=False) as file:
+        np.savez(file,
+                 digest=np.array(digest),
+                 channels=np.array(layout["channels"]),
+                 points3D=layout["points3D"],
+                 points2D=layout["points2D"],
+                 distances=layout["distances"],
+                 vertices=np.concatenate(layout["cells"]).reshape(-1, 2),
+                 offsets=offsets)
+    os.replace(file.name, path)
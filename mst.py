@@ -0,0 +1,373 @@
+import numpy as np
+import heapq
+import math
+
+# Edge density and number of vertices from which minimum_spanning_tree chooses the array-based Prim
+DENSE_DENSITY = 0.5
+DENSE_VERTICES = 256
+
+#------------------------------------------------------------------------------------------------------------------
+#   Minimum spanning tree
+#------------------------------------------------------------------------------------------------------------------
+def minimum_spanning_tree(graph, method = "auto"):
+    """
+        This method finds the minimum spanning tree (or forest, if the graph is not connected) of a graph.
+        With method "auto", the algorithm is chosen by the size and the edge density of the graph: the
+        array-based Prim for large graphs that are close to complete, and Kruskal otherwise. The heap-based
+        Prim is slower than Kruskal on edge arrays at every density, so it is only used when requested.
+
+        param graph: The graph whose minimum spanning tree is to be found.
+        param method: "auto", "kruskal", "prim_dense" or "prim_heap".
+        return: The list of edges (v1, v2, e) of the minimum spanning tree, in the same format as
+        KruskalMST, or None if the method is unknown.
+    """
+
+    if method == "auto":
+        method = _select_method(graph)
+
+    if method not in MST_METHODS:
+        print("Warning: Unknown minimum spanning tree method", method)
+        return None
+
+    u, v, w = MST_METHODS[method](graph)
+    vertices = graph.vertices()
+    return [(vertices[i], vertices[j], e) for i, j, e in zip(u.tolist(), v.tolist(), w.tolist())]
+
+def _select_method(graph):
+    """
+        This method chooses the minimum spanning tree algorithm by the number of vertices and the edge
+        density of the graph, which is the number of edges divided by the number of pairs of vertices.
+    """
+
+    n = graph.number_of_vertices()
+    if n < DENSE_VERTICES:
+        return "kruskal"
+
+    indptr, _, _ = graph.csr()
+    if indptr[-1] / (n * (n - 1)) >= DENSE_DENSITY:
+        return "prim_dense"
+    return "kruskal"
+
+#------------------------------------------------------------------------------------------------------------------
+#   Kruskal's algorithm
+#------------------------------------------------------------------------------------------------------------------
+def kruskal(graph):
+    """
+        This method finds the minimum spanning tree (or forest, if the graph is not connected) of a graph
+        using Kruskal's algorithm. The edges are sorted once, and the disjoint sets use path compression
+        and union by rank. The graph is not modified, so the method can be called repeatedly.
+
+        param graph: The graph whose minimum spanning tree is to be found.
+        return: A tuple (u, v, w) of NumPy arrays with the row indices of the end vertices and the weight
+        of every edge of the tree, in the order they were added.
+    """
+
+    n = graph.number_of_vertices()
+    u, v, w = _edge_arrays(graph)
+
+    # Sort all the edges in non-decreasing order. The sort is stable, so equal weights keep the order
+    # of the edge list.
+    order = np.argsort(w, kind='stable')
+
+    # Initialize the disjoint sets
+    parent = list(range(n))
+    rank = [0] * n
+
+    selected = []
+    for k, i, j in zip(order.tolist(), u[order].tolist(), v[order].tolist()):
+
+        # Find the root of each end, halving the paths on the way
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        while parent[j] != j:
+            parent[j] = parent[parent[j]]
+            j = parent[j]
+
+        if i == j:
+            continue
+
+        # Join the smaller tree to the larger one
+        if rank[i] < rank[j]:
+            i, j = j, i
+        parent[j] = i
+        if rank[i] == rank[j]:
+            rank[i] += 1
+
+        selected.append(k)
+        if len(selected) == n - 1:
+            break
+
+    selected = np.array(selected, dtype=np.int64)
+    return u[selected], v[selected], w[selected]
+
+def _edge_arrays(graph):
+    """
+        This method returns the edges of a graph as arrays of row indices and weights. In undirected
+        graphs every edge is returned once, with u < v.
+    """
+
+    edges = graph.edge_array()
+    return edges["u"], edges["v"], edges["w"]
+
+#------------------------------------------------------------------------------------------------------------------
+#   Prim's algorithm
+#------------------------------------------------------------------------------------------------------------------
+def prim_dense(graph):
+    """
+        This method finds the minimum spanning tree (or forest) of a graph using the array-based Prim's
+        algorithm, which takes O(V²) time whatever the number of edges. Each step adds the closest vertex
+        to the tree and updates the distances of the other vertices with one vectorized operation.
+
+        param graph: The graph whose minimum spanning tree is to be found.
+        return: A tuple (u, v, w) of NumPy arrays with the row indices of the end vertices and the weight
+        of every edge of the tree, in the order they were added. u is the vertex that was already in the
+        tree.
+    """
+
+    n = graph.number_of_vertices()
+    u, v, w = _edge_arrays(graph)
+
+    # Matrix with the lightest edge between every pair of vertices
+    matrix = np.full((n, n), np.inf)
+    np.minimum.at(matrix, (u, v), w)
+    np.minimum.at(matrix, (v, u), w)
+
+    key = np.full(n, np.inf)
+    parent = np.full(n, -1, dtype=np.int64)
+    outside = np.ones(n, dtype=bool)
+
+    tree_u = []
+    tree_v = []
+    tree_w = []
+    for _ in range(n):
+
+        # Closest vertex outside the tree. If none can be reached, a new tree of the forest starts.
+        candidates = np.where(outside, key, np.inf)
+        i = int(np.argmin(candidates))
+        if candidates[i] == np.inf:
+            i = int(np.argmax(outside))
+        else:
+            tree_u.append(parent[i])
+            tree_v.append(i)
+            tree_w.append(key[i])
+        outside[i] = False
+
+        # Update the distances to the tree
+        closer = outside & (matrix[i] < key)
+        key[closer] = matrix[i][closer]
+        parent[closer] = i
+
+    return np.array(tree_u, dtype=np.int32), np.array(tree_v, dtype=np.int32), np.array(tree_w, dtype=np.float64)
+
+def prim_heap(graph):
+    """
+        This method finds the minimum spanning tree (or forest) of a graph using Prim's algorithm with a
+        binary heap, which takes O(E log V) time.
+
+        param graph: The graph whose minimum spanning tree is to be found.
+        return: A tuple (u, v, w) of NumPy arrays with the row indices of the end vertices and the weight
+        of every edge of the tree, in the order they were added. u is the vertex that was already in the
+        tree.
+    """
+
+    n = graph.number_of_vertices()
+    u, v, w = _edge_arrays(graph)
+
+    # CSR lists of the undirected graph
+    rows = np.concatenate((u, v))
+    order = np.argsort(rows, kind='stable')
+    indptr = np.searchsorted(rows[order], np.arange(n + 1)).tolist()
+    indices = np.concatenate((v, u))[order].tolist()
+    weights = np.concatenate((w, w))[order].tolist()
+
+    # Only the edges that are lighter than the best known edge to a vertex are pushed to the heap
+    key = [math.inf] * n
+    inside = bytearray(n)
+    tree_u = []
+    tree_v = []
+    tree_w = []
+    for root in range(n):
+        if inside[root]:
+            continue
+
+        # Grow a new tree of the forest from root
+        heap = [(0.0, root, -1)]
+        while heap:
+            e, j, i = heapq.heappop(heap)
+            if inside[j]:
+                continue
+            inside[j] = 1
+            if i >= 0:
+                tree_u.append(i)
+                tree_v.append(j)
+                tree_w.append(e)
+            for k in range(indptr[j], indptr[j+1]):
+                if not inside[indices[k]] and weights[k] < key[indices[k]]:
+                    key[indices[k]] = weights[k]
+                    heapq.heappush(heap, (weights[k], indices[k], j))
+
+    return np.array(tree_u, dtype=np.int32), np.array(tree_v, dtype=np.int32), np.array(tree_w, dtype=np.float64)
+
+# Minimum spanning tree algorithms by name
+MST_METHODS = {"kruskal": kruskal, "prim_dense": prim_dense, "prim_heap": prim_heap}
+
+#------------------------------------------------------------------------------------------------------------------
+#   Dynamic minimum spanning tree
+#------------------------------------------------------------------------------------------------------------------
+class DynamicMST:
+    """
+        Class that is used to keep the minimum spanning tree (or forest) of an undirected graph while its
+        edges change. The tree is stored as a dictionary of tree neighbors per vertex index, and it is
+        updated in place:
+        * When an edge is inserted, the heaviest edge on the cycle that it creates is swapped out.
+        * When a tree edge is deleted, the cheapest edge that reconnects the two halves is swapped in.
+
+        The updates only walk the tree path between the ends of the edge, or the smaller of the two halves
+        of the tree, so they do not depend on the number of edges of the graph.
+
+        The graph creates and updates the object, see WeightedGraph.dynamic_mst.
+    """
+
+    def __init__(self, graph):
+        """
+            This constructor builds the minimum spanning tree of a graph with Kruskal's algorithm.
+
+            param graph: The undirected graph whose minimum spanning tree is kept.
+        """
+
+        self._graph = graph
+        self._tree = [{} for _ in range(graph.number_of_vertices())]
+        self._weight = 0.0
+
+        u, v, w = kruskal(graph)
+        for i, j, e in zip(u.tolist(), v.tolist(), w.tolist()):
+            self._link(i, j, e)
+
+    def edges(self):
+        """
+            This method returns the edges of the tree.
+
+            return: The list of edges (v1, v2, e) of the minimum spanning tree, in the same format as
+            KruskalMST, sorted by weight.
+        """
+
+        vertices = self._graph.vertices()
+        edges = [(vertices[i], vertices[j], e) for i in range(len(self._tree))
+                 for j, e in self._tree[i].items() if i < j]
+        return sorted(edges, key=lambda item: item[2])
+
+    def weight(self):
+        """
+            This method returns the total weight of the tree.
+        """
+        return self._weight
+
+    def insert(self, i, j, e):
+        """
+            This method updates the tree after the edge (i, j, e) is added to the graph.
+
+            param i: The row index of the start vertex of the edge.
+            param j: The row index of the end vertex of the edge.
+            param e: The weight of the edge.
+        """
+
+        path = self._tree_path(i, j)
+        if path is None:
+            # The edge joins two trees of the forest.
+            self._link(i, j, e)
+            return
+
+        # Heaviest edge on the cycle closed by the new edge
+        a, b = max(zip(path, path[1:]), key=lambda pair: self._tree[pair[0]][pair[1]])
+        if self._tree[a][b] > e:
+            self._cut(a, b)
+            self._link(i, j, e)
+
+    def delete(self, i, j, e):
+        """
+            This method updates the tree after the edge (i, j, e) is removed from the graph.
+
+            param i: The row index of the start vertex of the edge.
+            param j: The row index of the end vertex of the edge.
+            param e: The weight of the edge.
+        """
+
+        if self._tree[i].get(j) != e:
+            # The edge is not in the tree, so the tree does not change.
+            return
+
+        self._cut(i, j)
+        side = self._smaller_side(i, j)
+
+        # Cheapest edge of the graph that crosses from the smaller half to the other one
+        best = None
+        for x in side:
+            for y, w in self._graph._row_edges(x):
+                if y not in side and (best is None or w < best[2]):
+                    best = (x, y, w)
+
+        if best is not None:
+            self._link(*best)
+
+    def add_vertex(self):
+        """
+            This method adds an isolated vertex to the tree, after a vertex is added to the graph.
+        """
+        self._tree.append({})
+
+    def _link(self, i, j, e):
+        """
+            This method adds the edge (i, j, e) to the tree.
+        """
+
+        self._tree[i][j] = e
+        self._tree[j][i] = e
+        self._weight += e
+
+    def _cut(self, i, j):
+        """
+            This method removes the edge between i and j from the tree.
+        """
+
+        self._weight -= self._tree[i].pop(j)
+        del self._tree[j][i]
+
+    def _tree_path(self, i, j):
+        """
+            This method returns the list of vertices of the tree path from i to j, or None if i and j are in
+            different trees of the forest.
+        """
+
+        parent = {i: None}
+        stack = [i]
+        while stack:
+            x = stack.pop()
+            if x == j:
+                path = [j]
+                while parent[path[-1]] is not None:
+                    path.append(parent[path[-1]])
+                return path
+            for y in self._tree[x]:
+                if y not in parent:
+                    parent[y] = x
+                    stack.append(y)
+        return None
+
+    def _smaller_side(self, i, j):
+        """
+            This method returns the set of vertices of the smaller of the trees that contain i and j. Both
+            trees are traversed in turns, so the traversal stops as soon as the smaller one is complete.
+        """
+
+        sides = ({i}, {j})
+        stacks = ([i], [j])
+        while True:
+            for side, stack in zip(sides, stacks):
+                if not stack:
+                    return side
+                x = stack.pop()
+                for y in self._tree[x]:
+                    if y not in side:
+                        side.add(y)
+                        stack.append(y)
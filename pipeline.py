@@ -0,0 +1,225 @@
+import numpy as np
+import os
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from cohort import TASKS, open_cohort, script_dir
+from graph import WeightedGraph
+from hull import convex_hull, convex_hull_batch
+from montage import montage_layout
+from mst import minimum_spanning_tree
+from search import shortest_paths, floyd_marshall, hop_distances
+
+# Pairs of electrodes whose paths are searched, by number of channels
+SEARCH_PAIRS = {8: [('Fz', 'PO8'), ('C3', 'Oz'), ('PO7', 'C4'), ('PO8', 'Pz'), ('C3', 'C4')],
+                32: [('F7', 'PO4'), ('CP5', 'O2'), ('P4', 'T7'), ('AF3', 'CP6'), ('F8', 'CP2'), ('Fz', 'O2'), ('PO3', 'F4')]}
+
+#------------------------------------------------------------------------------------------------------------------
+#   Pipeline stages
+#------------------------------------------------------------------------------------------------------------------
+
+def stage_paths(job):
+    """
+        Path search stage (Etapa02). Finds the paths of the search pairs of the montage with BFS, DFS and
+        uniform cost search, and the length and number of edges of the shortest paths between all the
+        electrodes.
+
+        param job: The job dictionary built by _run_job.
+        return: A dictionary with the path results of each algorithm, the Floyd-Marshall distances and the
+        hop distances.
+    """
+
+    pairs = SEARCH_PAIRS.get(len(job["channels"]), [])
+    result = {algorithm: shortest_paths(job["graph"], pairs, algorithm) for algorithm in ("bfs", "dfs", "uniform_cost")}
+    result["floyd"] = floyd_marshall(job["graph"].adjacency_matrix())[0]
+    result["hops"] = hop_distances(job["graph"].adjacency_matrix())
+    return result
+
+def stage_mst(job):
+    """
+        Minimum spanning tree stage (Etapa03).
+
+        param job: The job dictionary built by _run_job.
+        return: The list of edges of the minimum spanning tree.
+    """
+    return _mst(job)
+
+def stage_hull(job):
+    """
+        Convex hull stage (Etapa04). Finds the convex hull of the 2D positions of the vertices of the
+        minimum spanning tree.
+
+        param job: The job dictionary built by _run_job.
+        return: A dictionary with the channels of the hull in counterclockwise order, its area and its
+        perimeter.
+    """
+
+    indices, area, perimeter = convex_hull(job["points2D"][_mst_vertices(job)])
+    return {"channels": [job["channels"][i] for i in _mst_vertices(job)[indices]], "area": area, "perimeter": perimeter}
+
+def stage_degree(job):
+    """
+        Degree stage (Etapa05). Finds the degree of each electrode, which is the value that colors its
+        Voronoi cell.
+
+        param job: The job dictionary built by _run_job.
+        return: The array with the degree of each channel.
+    """
+    return np.sum(job["matrix"], axis=0)
+
+# Stages of the pipeline, in the order they run
+STAGES = {"paths": stage_paths, "mst": stage_mst, "hull": stage_hull, "degree": stage_degree}
+
+def _mst(job):
+    """
+        This method returns the minimum spanning tree of the job graph, which is computed once and shared
+        by the stages that need it.
+    """
+
+    if "mst" not in job:
+        job["mst"] = minimum_spanning_tree(job["graph"])
+    return job["mst"]
+
+def _mst_vertices(job):
+    """
+        This method returns the sorted array of row indices of the vertices of the minimum spanning tree.
+    """
+
+    index = job["layout"]["index"]
+    return np.array(sorted({index[v] for edge in _mst(job) for v in edge[:2]}), dtype=np.int64)
+
+#------------------------------------------------------------------------------------------------------------------
+#   Pipeline runner
+#------------------------------------------------------------------------------------------------------------------
+
+def run_pipeline(subjects = None, stages = None, processes = None, max_pending = None, root = script_dir):
+    """
+        This method runs the pipeline stages on every task of every subject. Each subject x task job runs
+        in a process pool. At most max_pending jobs are submitted at once, and only their matrices are
+        unpacked, so the memory does not grow with the size of the cohort.
+
+        param subjects: The subject folders, or None to use every subject of the cohort.
+        param stages: The names of the stages to run, or None to run every stage.
+        param processes: The number of worker processes, or None to use one per CPU.
+        param max_pending: The maximum number of jobs that are submitted and not collected yet, or None
+                           to use twice the number of processes.
+        param root: The folder that contains the subject folders.
+        return: A generator of (subject, task, results) tuples in the order of the subjects and tasks,
+        where results maps each stage name to its result.
+    """
+
+    stages = list(STAGES) if stages is None else list(stages)
+    for stage in stages:
+        if stage not in STAGES:
+            print("Warning: Unknown pipeline stage", stage)
+            return
+
+    opened = open_cohort(subjects, root)
+    if opened is None:
+        return
+
+    # The montage layouts are built once here, so the workers only read their cache
+    for n in sorted({n for _, _, n in opened}):
+        montage_layout(n)
+
+    processes = processes or os.cpu_count() or 1
+    max_pending = max_pending or 2 * processes
+
+    with ProcessPoolExecutor(processes) as executor:
+        pending = deque()
+        for subject, packed, n in opened:
+            for t, task in enumerate(TASKS):
+                pending.append((subject, task, executor.submit(_run_job, packed[t], n, stages)))
+
+                # Collect the oldest job when the window is full
+                if len(pending) >= max_pending:
+                    subject_done, task_done, future = pending.popleft()
+                    yield subject_done, task_done, future.result()
+
+        while pending:
+            subject_done, task_done, future = pending.popleft()
+            yield subject_done, task_done, future.result()
+
+def _run_job(packed, n, stages):
+    """
+        This method runs the pipeline stages on a single connectivity matrix. It is called in the worker
+        processes.
+
+        param packed: The bit-packed connectivity matrix.
+        param n: The number of channels.
+        param stages: The names of the stages to run.
+        return: A dictionary that maps each stage name to its result, which is empty if there is no montage
+        with n channels.
+    """
+
+    layout = montage_layout(n)
+    if layout is None:
+        print("Warning: The job is skipped, there is no montage with", n, "channels.")
+        return {}
+
+    matrix = np.unpackbits(np.asarray(packed), axis=-1, count=n)
+
+    job = {"matrix": matrix,
+           "layout": layout,
+           "channels": layout["channels"],
+           "points3D": layout["points3D"],
+           "points2D": layout["points2D"],
+           "graph": WeightedGraph.from_adjacency(matrix, layout["channels"], layout["points3D"],
+                                                 distances=layout["distances"])}
+
+    return {stage: STAGES[stage](job) for stage in stages}
+
+#------------------------------------------------------------------------------------------------------------------
+#   Cohort convex hulls
+#------------------------------------------------------------------------------------------------------------------
+
+def cohort_hulls(subjects = None, processes = None, root = script_dir):
+    """
+        This method finds the convex hull of the minimum spanning tree vertices of every task of every
+        subject. The trees are found by the pipeline, and then the hulls of all the tasks with the same
+        montage are computed by a single batch call.
+
+        param subjects: The subject folders, or None to use every subject of the cohort.
+        param processes: The number of worker processes, or None to use one per CPU.
+        param root: The folder that contains the subject folders.
+        return: A list of (subject, task, channels, area, perimeter) tuples in the order of the subjects and
+        tasks, where channels are the channels of the hull in counterclockwise order. The tasks of subjects
+        without a montage are skipped.
+    """
+
+    opened = open_cohort(subjects, root)
+    if opened is None:
+        return None
+    sizes = {subject: n for subject, _, n in opened}
+
+    # Vertices of each tree, grouped by number of channels
+    groups = {}
+    for position, (subject, task, results) in enumerate(run_pipeline(subjects, ["mst"], processes, root = root)):
+        if "mst" not in results:
+            print("Warning: Task", task, "of subject", subject, "is skipped, there is no montage with",
+                  sizes[subject], "channels.")
+            continue
+
+        index = montage_layout(sizes[subject])["index"]
+        mask = np.zeros(len(index), dtype=bool)
+        for edge in results["mst"]:
+            mask[index[edge[0]]] = True
+            mask[index[edge[1]]] = True
+        groups.setdefault(len(index), []).append((position, subject, task, mask))
+
+    hulls = []
+    for n, group in groups.items():
+        layout = montage_layout(n)
+        indices, areas, perimeters = convex_hull_batch(layout["points2D"], [item[3] for item in group])
+        for (position, subject, task, _), hull, area, perimeter in zip(group, indices, areas, perimeters):
+            hulls.append((position, subject, task, [layout["channels"][i] for i in hull], area, perimeter))
+
+    return [hull[1:] for hull in sorted(hulls, key=lambda hull: hull[0])]
+
+if __name__ == '__main__':
+    for subject, task, results in run_pipeline():
+        print("\n\n", subject, task)
+        for stage in results:
+            print("------------", stage, "--------")
+            print(results[stage])
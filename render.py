@@ -0,0 +1,100 @@
+import numpy as np
+import matplotlib as mpl
+
+from matplotlib.collections import LineCollection
+
+#------------------------------------------------------------------------------------------------------------------
+#   Graph rendering
+#------------------------------------------------------------------------------------------------------------------
+
+def matrix_edges(matrix, directed = False):
+    """
+        This method returns the edges of a connectivity matrix as arrays of row indices. In undirected
+        graphs every pair of connected electrodes is returned once, with u < v, so its line is drawn once.
+
+        param matrix: The n x n connectivity matrix.
+        param directed: A flag that indicates whether matrix[i][j] and matrix[j][i] are different edges.
+        return: A tuple (u, v) of arrays with the start and end row index of every edge.
+    """
+
+    connected = np.asarray(matrix) == 1
+    if not directed:
+        connected = np.triu(connected | connected.T, 1)
+    return np.nonzero(connected)
+
+def draw_electrodes(ax, points2D, channels = None, color = None, size = None):
+    """
+        This method draws all the electrodes with a single scatter call, and their names next to them.
+
+        param ax: The axes to draw on.
+        param points2D: The n x 2 positions of the electrodes.
+        param channels: The names of the n channels, or None to draw no names.
+        param color: The color of the electrodes, or None to use the default one.
+        param size: The marker size of the electrodes, or None to use the default one.
+        return: The PathCollection of the electrodes.
+    """
+
+    points2D = np.asarray(points2D, dtype=np.float64).reshape(-1, 2)
+    markers = ax.scatter(points2D[:, 0], points2D[:, 1], color=color, s=size)
+
+    if channels is not None:
+        for (x, y), channel in zip(points2D.tolist(), channels):
+            ax.text(x - 0.02, y + 0.025, channel)
+
+    return markers
+
+def draw_edges(ax, points2D, u, v, colors = 'k', widths = None, alpha = None):
+    """
+        This method draws all the edges of a graph as a single LineCollection, instead of one line per
+        edge, so the number of artists does not grow with the number of edges.
+
+        param ax: The axes to draw on.
+        param points2D: The n x 2 positions of the vertices.
+        param u: The row indices of the start vertices of the edges.
+        param v: The row indices of the end vertices of the edges.
+        param colors: A color for every edge, or a single color for all of them.
+        param widths: A line width for every edge, a single width for all of them, or None to use the
+                      default width of the lines.
+        param alpha: The transparency of the edges, or None for opaque edges.
+        return: The LineCollection of the edges.
+    """
+
+    points2D = np.asarray(points2D, dtype=np.float64).reshape(-1, 2)
+    u = np.asarray(u, dtype=np.int64)
+    v = np.asarray(v, dtype=np.int64)
+    widths = mpl.rcParams['lines.linewidth'] if widths is None else widths
+
+    # One segment of two points per edge. The edges are drawn over the electrodes, like plt.plot does.
+    segments = np.stack((points2D[u], points2D[v]), axis=1)
+    lines = LineCollection(segments, colors=colors, linewidths=widths, alpha=alpha, zorder=2)
+    ax.add_collection(lines)
+    ax.autoscale_view()
+    return lines
+
+def draw_weights(ax, points2D, u, v, weights, selected = None, color = 'r', fontsize = 8):
+    """
+        This method writes the weight of the selected edges in the middle of their lines.
+
+        param ax: The axes to draw on.
+        param points2D: The n x 2 positions of the vertices.
+        param u: The row indices of the start vertices of the edges.
+        param v: The row indices of the end vertices of the edges.
+        param weights: The weight of every edge.
+        param selected: A boolean mask or an array of indices of the edges whose weight is written, or
+                        None to write every weight.
+        param color: The color of the text.
+        param fontsize: The size of the text.
+        return: The list of Text objects.
+    """
+
+    points2D = np.asarray(points2D, dtype=np.float64).reshape(-1, 2)
+    u = np.asarray(u, dtype=np.int64)
+    v = np.asarray(v, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float64)
+
+    if selected is not None:
+        u, v, weights = u[selected], v[selected], weights[selected]
+
+    middles = (points2D[u] + points2D[v]) / 2
+    return [ax.text(x, y, format(w, ".2f"), color=color, fontsize=fontsize)
+            for (x, y), w in zip(middles.tolist(), weights.tolist())]
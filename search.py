@@ -0,0 +1,956 @@
+import numpy as np
+import heapq
+import math
+
+from collections import deque
+
+#------------------------------------------------------------------------------------------------------------------
+#   Breadth-first search algorithm
+#------------------------------------------------------------------------------------------------------------------
+def bfs(graph, vi, vg):
+    """
+        This method finds a path in a graph from vertices vi to vg using the breadth-first search
+        algorithm. The search tree from vi is cached in the graph, so later queries from vi are
+        answered from the tree until the graph changes.
+
+        param graph: The graph with that is to be traverse.
+        param vi: The initial vertex.
+        param vg: The goal vertex.
+        return: A dictionary with the path from vi to vg and its cost, or None if there is no a path.
+    """
+
+    # Check graph and vertices
+    if not _check_vertices(graph, vi, vg):
+        return None
+
+    # There is no path between vertices of different components
+    if not graph.same_component(vi, vg):
+        return None
+
+    return _tree_path(graph, _bfs_tree(graph, vi), vg)
+
+#------------------------------------------------------------------------------------------------------------------
+#   Depth-first search algorithm
+#------------------------------------------------------------------------------------------------------------------
+def dfs(graph, vi, vg):
+    """
+        This method finds a path in a graph from vertices vi to vg using the depth-first search
+        algorithm. The search tree from vi is cached in the graph, so later queries from vi are
+        answered from the tree until the graph changes.
+
+        param graph: The graph with that is to be traverse.
+        param vi: The initial vertex.
+        param vg: The goal vertex.
+        return: A dictionary with the path from vi to vg and its cost, or None if there is no a path.
+    """
+
+    # Check graph and vertices
+    if not _check_vertices(graph, vi, vg):
+        return None
+
+    # There is no path between vertices of different components
+    if not graph.same_component(vi, vg):
+        return None
+
+    return _tree_path(graph, _dfs_tree(graph, vi), vg)
+
+#------------------------------------------------------------------------------------------------------------------
+#   Traversal generators
+#------------------------------------------------------------------------------------------------------------------
+def iter_bfs(graph, source):
+    """
+        This method traverses a graph from a vertex in breadth-first order. The vertices are yielded as
+        they are reached, so the caller can stop the traversal at any time, for example as soon as a
+        vertex meets a condition.
+
+        param graph: The graph with that is to be traverse.
+        param source: The initial vertex.
+        return: A generator of (vertex, depth, cost, parent) tuples, where depth is the number of edges
+        from source, cost is the sum of their weights and parent is the previous vertex, or None for the
+        source.
+    """
+
+    if graph.vertex_index(source) is None:
+        print("Warning: Vertex", source, "is not in Graph")
+        return
+
+    vertices = graph.vertices()
+    for i, depth, cost, parent in _bfs_indices(graph, graph.vertex_index(source)):
+        yield vertices[i], depth, cost, vertices[parent] if parent >= 0 else None
+
+def iter_dfs(graph, source):
+    """
+        This method traverses a graph from a vertex in depth-first order, the same order as dfs. The
+        vertices are yielded as they are reached, so the caller can stop the traversal at any time.
+
+        param graph: The graph with that is to be traverse.
+        param source: The initial vertex.
+        return: A generator of (vertex, depth, cost, parent) tuples, where depth is the number of edges
+        from source, cost is the sum of their weights and parent is the previous vertex, or None for the
+        source.
+    """
+
+    if graph.vertex_index(source) is None:
+        print("Warning: Vertex", source, "is not in Graph")
+        return
+
+    vertices = graph.vertices()
+    for i, depth, cost, parent in _dfs_indices(graph, graph.vertex_index(source)):
+        yield vertices[i], depth, cost, vertices[parent] if parent >= 0 else None
+
+def _bfs_indices(graph, i):
+    """
+        This method traverses a graph in breadth-first order from the vertex with row index i, and yields
+        (index, depth, cost, parent index) tuples, where the parent index of the source is -1.
+    """
+
+    indptr, indices, weights = graph.csr_lists()
+
+    # A vertex is marked when it is added to the frontier, so it is added only once
+    visited = bytearray(len(indptr) - 1)
+    visited[i] = 1
+    frontier = deque([(i, 0, 0.0, -1)])
+
+    while frontier:
+        i, depth, cost, parent = frontier.popleft()
+        yield i, depth, cost, parent
+
+        for k in range(indptr[i], indptr[i+1]):
+            j = indices[k]
+            if not visited[j]:
+                visited[j] = 1
+                frontier.append((j, depth + 1, cost + weights[k], i))
+
+def _dfs_indices(graph, i):
+    """
+        This method traverses a graph in depth-first order from the vertex with row index i, and yields
+        (index, depth, cost, parent index) tuples, where the parent index of the source is -1.
+    """
+
+    indptr, indices, weights = graph.csr_lists()
+
+    # A vertex is marked when it is taken from the stack, so the last edge pushed to it wins
+    visited = bytearray(len(indptr) - 1)
+    stack = [(i, 0, 0.0, -1)]
+
+    while stack:
+        i, depth, cost, parent = stack.pop()
+        if visited[i]:
+            continue
+        visited[i] = 1
+        yield i, depth, cost, parent
+
+        for k in range(indptr[i], indptr[i+1]):
+            j = indices[k]
+            if not visited[j]:
+                stack.append((j, depth + 1, cost + weights[k], i))
+
+def _bfs_tree(graph, vi):
+    """
+        This method returns the breadth-first search tree from vi, from the cache of the graph if possible.
+    """
+
+    tree = graph.cached_tree("bfs", vi)
+    if tree is None:
+        tree = _search_tree(graph, _bfs_indices(graph, graph.vertex_index(vi)))
+        graph.cache_tree("bfs", vi, tree)
+    return tree
+
+def _dfs_tree(graph, vi):
+    """
+        This method returns the depth-first search tree from vi, from the cache of the graph if possible.
+    """
+
+    tree = graph.cached_tree("dfs", vi)
+    if tree is None:
+        tree = _search_tree(graph, _dfs_indices(graph, graph.vertex_index(vi)))
+        graph.cache_tree("dfs", vi, tree)
+    return tree
+
+def _search_tree(graph, traversal):
+    """
+        This method runs a whole traversal of the graph and keeps the first edge that reaches each vertex.
+        That edge is the one where a search for that goal vertex would stop, so the tree answers the
+        queries of every goal.
+
+        param graph: The graph with that is to be traverse.
+        param traversal: The generator returned by _bfs_indices or _dfs_indices.
+        return: A dictionary with the parent index of each vertex ("previous", -1 for the root) and the
+        cost of the path from the root to it ("cost", None if the vertex is not reached).
+    """
+
+    n = graph.number_of_vertices()
+    previous = [-1] * n
+    cost = [None] * n
+
+    for i, _, c, parent in traversal:
+        previous[i] = parent
+        cost[i] = c
+
+    return {"previous": previous, "cost": cost}
+
+def _tree_path(graph, tree, vg):
+    """
+        This method builds the path from the root of a search tree to a goal vertex.
+
+        param graph: The graph that was searched.
+        param tree: The dictionary returned by _search_tree.
+        param vg: The goal vertex.
+        return: A dictionary with the path and its cost, or None if the goal is not in the tree.
+    """
+
+    goal = graph.vertex_index(vg)
+    if tree["cost"][goal] is None:
+        return None
+
+    return {"Path": _build_path(graph, tree["previous"], goal), "Cost": tree["cost"][goal]}
+
+#------------------------------------------------------------------------------------------------------------------
+#   Uniform cost search algorithm (Dijkstra)
+#------------------------------------------------------------------------------------------------------------------
+def uniform_cost(graph, vi, vg):
+    """
+        This method finds a path in a graph from vertices vi to vg using the uniform cost search
+        algorithm. The search runs on the vertex indices of the graph with a binary heap, and it
+        stops as soon as the goal vertex is settled. The state of the search is cached in the graph,
+        so a later query from vi resumes it instead of starting again.
+
+        param graph: The graph with that is to be traverse.
+        param vi: The initial vertex.
+        param vg: The goal vertex.
+        return: A dictionary with the path from vi to vg and its cost, or None if there is no a path.
+    """
+
+    # Check graph and vertices
+    if not _check_vertices(graph, vi, vg):
+        return None
+
+    # There is no path between vertices of different components
+    if not graph.same_component(vi, vg):
+        return None
+
+    return _state_path(graph, _uniform_cost_state(graph, vi), vg)
+
+def _uniform_cost_state(graph, vi):
+    """
+        This method returns the uniform cost search state from vi, from the cache of the graph if possible.
+    """
+
+    state = graph.cached_tree("uniform_cost", vi)
+    if state is None:
+        n = graph.number_of_vertices()
+        source = graph.vertex_index(vi)
+        state = {"csr": graph.csr_lists(),
+                 "distance": [math.inf] * n,
+                 "previous": [-1] * n,
+                 "settled": [False] * n,
+                 "frontier": [(0, source)]}
+        state["distance"][source] = 0
+        graph.cache_tree("uniform_cost", vi, state)
+    return state
+
+def _state_path(graph, state, vg):
+    """
+        This method builds the lowest cost path to a goal vertex from a uniform cost search state.
+
+        return: A dictionary with the path and its cost, or None if there is no a path.
+    """
+
+    goal = graph.vertex_index(vg)
+    if not _settle(state, goal):
+        return None
+
+    return {"Path": _build_path(graph, state["previous"], goal), "Cost": float(state["distance"][goal])}
+
+def _settle(state, goal):
+    """
+        This method continues a uniform cost search until the goal vertex is settled.
+
+        param state: The search state built by uniform_cost.
+        param goal: The index of the goal vertex.
+        return: True if the goal vertex is reachable, False otherwise.
+    """
+
+    indptr, indices, weights = state["csr"]
+    distance = state["distance"]
+    previous = state["previous"]
+    settled = state["settled"]
+    frontier = state["frontier"]
+
+    while not settled[goal] and frontier:
+
+        # Get vertex from frontier
+        cost, i = heapq.heappop(frontier)
+
+        # Skip stale entries of vertices that were already settled with a lower cost
+        if settled[i]:
+            continue
+        settled[i] = True
+
+        # Expand vertex
+        for k in range(indptr[i], indptr[i+1]):
+            j = indices[k]
+            new_cost = cost + weights[k]
+            if new_cost < distance[j]:
+                distance[j] = new_cost
+                previous[j] = i
+                heapq.heappush(frontier, (new_cost, j))
+
+    return settled[goal]
+
+def _check_vertices(graph, vi, vg):
+    """
+        This method checks that the initial and the goal vertices of a search are in the graph.
+
+        return: True if both vertices are in the graph, False otherwise.
+    """
+
+    if graph.vertex_index(vi) is None:
+        print("Warning: Vertex", vi, "is not in Graph")
+
+    if graph.vertex_index(vg) is None:
+        print("Warning: Vertex", vg, "is not in Graph")
+
+    return graph.vertex_index(vi) is not None and graph.vertex_index(vg) is not None
+
+#------------------------------------------------------------------------------------------------------------------
+#   Batch path queries
+#------------------------------------------------------------------------------------------------------------------
+def shortest_paths(graph, pairs, algorithm = "uniform_cost"):
+    """
+        This method finds the paths of many (vi, vg) pairs. The pairs are grouped by their initial
+        vertex, and a single search is run for each distinct initial vertex.
+
+        param graph: The graph with that is to be traverse.
+        param pairs: A sequence of (vi, vg) pairs.
+        param algorithm: The search algorithm, "bfs", "dfs" or "uniform_cost".
+        return: A list with the result of each pair, in the same order as pairs. Each result is a
+        dictionary with the path and its cost, or None if there is no a path.
+    """
+
+    if algorithm not in ("bfs", "dfs", "uniform_cost"):
+        print("Warning: Unknown search algorithm", algorithm)
+        return None
+
+    # Positions of the pairs that share each initial vertex
+    groups = {}
+    for k, (vi, vg) in enumerate(pairs):
+        groups.setdefault(vi, []).append(k)
+
+    results = [None] * len(pairs)
+
+    for vi, positions in groups.items():
+        if graph.vertex_index(vi) is None:
+            print("Warning: Vertex", vi, "is not in Graph")
+            continue
+
+        # Goals that are in other components have no path, so no search is needed for them
+        positions = [k for k in positions if graph.vertex_index(pairs[k][1]) is None or graph.same_component(vi, pairs[k][1])]
+        if not positions:
+            continue
+
+        if algorithm == "bfs":
+            tree = _bfs_tree(graph, vi)
+        elif algorithm == "dfs":
+            tree = _dfs_tree(graph, vi)
+        else:
+            state = _uniform_cost_state(graph, vi)
+
+        for k in positions:
+            vg = pairs[k][1]
+            if graph.vertex_index(vg) is None:
+                print("Warning: Vertex", vg, "is not in Graph")
+            elif algorithm == "uniform_cost":
+                results[k] = _state_path(graph, state, vg)
+            else:
+                results[k] = _tree_path(graph, tree, vg)
+
+    return results
+
+#------------------------------------------------------------------------------------------------------------------
+#   A* search algorithm
+#------------------------------------------------------------------------------------------------------------------
+def astar(graph, vi, vg):
+    """
+        This method finds a path in a graph from vertices vi to vg using the A* search algorithm. The
+        heuristic is the straight-line distance from each vertex to the goal, computed from the coordinates
+        stored in the graph with set_coordinates. When the edge weights are the distances between the
+        electrodes, this heuristic never overestimates the cost, so the path is the same as the one found
+        by uniform_cost.
+
+        param graph: The graph with that is to be traverse.
+        param vi: The initial vertex.
+        param vg: The goal vertex.
+        return: A dictionary with the path from vi to vg, its cost and the number of expanded vertices,
+        or None if there is no a path.
+    """
+
+    # Check graph and vertices
+    if not _check_vertices(graph, vi, vg):
+        return None
+
+    # There is no path between vertices of different components
+    if not graph.same_component(vi, vg):
+        return None
+
+    source = graph.vertex_index(vi)
+    goal = graph.vertex_index(vg)
+
+    indptr, indices, weights = graph.csr_lists()
+    n = graph.number_of_vertices()
+
+    # Straight-line distance from each vertex to the goal. Vertices without position use 0.
+    points = graph.coordinates()
+    if points is None:
+        print("Warning: The graph has no coordinates, A* runs as uniform cost search.")
+        heuristic = [0.0] * n
+    else:
+        heuristic = np.nan_to_num(np.linalg.norm(points - points[goal], axis=1)).tolist()
+
+    # Best known cost and predecessor of each vertex
+    distance = [math.inf] * n
+    previous = [-1] * n
+    distance[source] = 0
+    expanded = 0
+
+    # Initialize frontier
+    frontier = [(heuristic[source], 0, source)]
+
+    while frontier:
+
+        # Get vertex from frontier
+        _, cost, i = heapq.heappop(frontier)
+
+        # Skip stale entries of vertices that were already reached with a lower cost
+        if cost > distance[i]:
+            continue
+
+        # Test vertex
+        if i == goal:
+            return {"Path": _build_path(graph, previous, goal), "Cost": float(cost), "Expanded": expanded}
+
+        # Expand vertex
+        expanded += 1
+        for k in range(indptr[i], indptr[i+1]):
+            j = indices[k]
+            new_cost = cost + weights[k]
+            if new_cost < distance[j]:
+                distance[j] = new_cost
+                previous[j] = i
+                heapq.heappush(frontier, (new_cost + heuristic[j], new_cost, j))
+
+    return None
+
+#------------------------------------------------------------------------------------------------------------------
+#   Bidirectional search algorithms
+#------------------------------------------------------------------------------------------------------------------
+def bidirectional_bfs(graph, vi, vg):
+    """
+        This method finds a path in a graph from vertices vi to vg with the fewest edges, searching
+        breadth-first from both ends at the same time. Each step expands a whole level of the smaller
+        frontier, and the search stops at the first level where the two frontiers meet.
+
+        param graph: The graph with that is to be traverse.
+        param vi: The initial vertex.
+        param vg: The goal vertex.
+        return: A dictionary with the path from vi to vg and its cost, or None if there is no a path.
+    """
+
+    # Check graph and vertices
+    if not _check_vertices(graph, vi, vg):
+        return None
+
+    # There is no path between vertices of different components
+    if not graph.same_component(vi, vg):
+        return None
+
+    source = graph.vertex_index(vi)
+    goal = graph.vertex_index(vg)
+
+    if source == goal:
+        return {"Path": [vi], "Cost": 0.0}
+
+    sides = [graph.csr_lists(), graph.csr_lists(reverse=True)]
+    n = graph.number_of_vertices()
+
+    # Depth, predecessor and weight of the edge to the predecessor, for the forward and backward searches
+    depth = [[-1] * n, [-1] * n]
+    previous = [[-1] * n, [-1] * n]
+    step = [[0.0] * n, [0.0] * n]
+    depth[0][source] = 0
+    depth[1][goal] = 0
+    frontier = [[source], [goal]]
+
+    while frontier[0] and frontier[1]:
+
+        # Expand the smaller frontier
+        side = 0 if len(frontier[0]) <= len(frontier[1]) else 1
+        other = 1 - side
+        indptr, indices, weights = sides[side]
+        best = None
+        next_frontier = []
+
+        for i in frontier[side]:
+            for k in range(indptr[i], indptr[i+1]):
+                j = indices[k]
+                if depth[side][j] == -1:
+                    depth[side][j] = depth[side][i] + 1
+                    previous[side][j] = i
+                    step[side][j] = weights[k]
+                    next_frontier.append(j)
+
+                    # Test whether the frontiers meet at j
+                    if depth[other][j] != -1:
+                        hops = depth[side][j] + depth[other][j]
+                        if best is None or hops < best[0]:
+                            best = (hops, j)
+
+        if best is not None:
+            return _join_paths(graph, previous, step, best[1])
+
+        frontier[side] = next_frontier
+
+    return None
+
+def bidirectional_uniform_cost(graph, vi, vg):
+    """
+        This method finds the lowest cost path in a graph from vertices vi to vg, running the uniform
+        cost search from both ends at the same time. The search stops when the lowest costs of the two
+        frontiers add up to at least the cost of the best path that joins them.
+
+        param graph: The graph with that is to be traverse.
+        param vi: The initial vertex.
+        param vg: The goal vertex.
+        return: A dictionary with the path from vi to vg and its cost, or None if there is no a path.
+    """
+
+    # Check graph and vertices
+    if not _check_vertices(graph, vi, vg):
+        return None
+
+    # There is no path between vertices of different components
+    if not graph.same_component(vi, vg):
+        return None
+
+    source = graph.vertex_index(vi)
+    goal = graph.vertex_index(vg)
+
+    if source == goal:
+        return {"Path": [vi], "Cost": 0.0}
+
+    sides = [graph.csr_lists(), graph.csr_lists(reverse=True)]
+    n = graph.number_of_vertices()
+
+    # Best known cost, predecessor and weight of the edge to the predecessor, for both searches
+    distance = [[math.inf] * n, [math.inf] * n]
+    previous = [[-1] * n, [-1] * n]
+    step = [[0.0] * n, [0.0] * n]
+    distance[0][source] = 0
+    distance[1][goal] = 0
+    frontier = [[(0, source)], [(0, goal)]]
+
+    # Cost of the best path found so far and the vertex where its two halves meet
+    best_cost = math.inf
+    meeting = -1
+
+    while frontier[0] and frontier[1]:
+        if frontier[0][0][0] + frontier[1][0][0] >= best_cost:
+            break
+
+        # Expand the side whose next vertex is closer to its root
+        side = 0 if frontier[0][0][0] <= frontier[1][0][0] else 1
+        other = 1 - side
+        indptr, indices, weights = sides[side]
+
+        cost, i = heapq.heappop(frontier[side])
+
+        # Skip stale entries of vertices that were already reached with a lower cost
+        if cost > distance[side][i]:
+            continue
+
+        for k in range(indptr[i], indptr[i+1]):
+            j = indices[k]
+            new_cost = cost + weights[k]
+            if new_cost < distance[side][j]:
+                distance[side][j] = new_cost
+                previous[side][j] = i
+                step[side][j] = weights[k]
+                heapq.heappush(frontier[side], (new_cost, j))
+
+                # Test whether the path through j is the best one that joins both searches
+                if new_cost + distance[other][j] < best_cost:
+                    best_cost = new_cost + distance[other][j]
+                    meeting = j
+
+    if meeting == -1:
+        return None
+
+    return _join_paths(graph, previous, step, meeting)
+
+def _join_paths(graph, previous, step, meeting):
+    """
+        This method joins the paths of a forward and a backward search that meet at a vertex.
+
+        param graph: The graph that was searched.
+        param previous: The predecessor lists of the forward and the backward searches.
+        param step: The weight of the edge to the predecessor, for both searches.
+        param meeting: The index of the vertex where the searches meet.
+        return: A dictionary with the path from the root of the forward search to the root of the
+        backward search, and its cost.
+    """
+
+    vertices = graph.vertices()
+    path = []
+    cost = 0.0
+
+    i = meeting
+    while i != -1:
+        path.append(vertices[i])
+        cost += step[0][i]
+        i = previous[0][i]
+    path.reverse()
+
+    i = meeting
+    while previous[1][i] != -1:
+        cost += step[1][i]
+        i = previous[1][i]
+        path.append(vertices[i])
+
+    return {"Path": path, "Cost": float(cost)}
+
+def _build_path(graph, previous, goal):
+    """
+        This method builds the path from the root of a search to the goal vertex.
+
+        param graph: The graph that was searched.
+        param previous: The predecessor index of each vertex, or -1 for the root.
+        param goal: The index of the goal vertex.
+        return: The list of vertices from the root to the goal.
+    """
+
+    vertices = graph.vertices()
+    path = []
+    while goal != -1:
+        path.append(vertices[goal])
+        goal = previous[goal]
+    path.reverse()
+    return path
+
+
+#------------------------------------------------------------------------------------------------------------------
+#   All-sources breadth-first search
+#------------------------------------------------------------------------------------------------------------------
+def hop_distances(adjacency_matrix, predecessors = False):
+    """
+        This method finds the number of edges of the shortest paths between all the vertices of a graph,
+        or of a stack of graphs, for example a (subjects x tasks x n x n) tensor with every connectivity
+        matrix of a cohort. The searches from every source advance together, one level at a time: the
+        next frontier of all the sources is the boolean product of the current frontier and the
+        adjacency matrix.
+
+        param adjacency_matrix: An array of shape (..., n, n), where a nonzero value at [i][j] means that
+        there is an edge from i to j.
+        param predecessors: A flag that indicates whether the predecessor matrix is also returned.
+        return: An int16 array with the same shape as adjacency_matrix, with the number of edges of the
+        shortest path from i to j, or -1 if there is no path. If predecessors is True, a tuple
+        (hops, previous), where previous[..., i, j] is the vertex before j in a shortest path from i to j,
+        or -1 if there is no path or i is j.
+    """
+
+    adjacency = np.asarray(adjacency_matrix) != 0
+    n = adjacency.shape[-1]
+    weights = adjacency.astype(np.float32)
+
+    frontier = np.broadcast_to(np.eye(n, dtype=bool), adjacency.shape).copy()
+    visited = frontier.copy()
+    hops = np.where(frontier, 0, -1).astype(np.int16)
+    previous = np.full(adjacency.shape, -1, dtype=np.int16) if predecessors else None
+    incoming = np.swapaxes(adjacency, -1, -2)
+
+    for level in range(1, n):
+        # Vertices adjacent to the frontier of each source that have not been reached yet
+        reached = (frontier.astype(np.float32) @ weights > 0) & ~visited
+        if not reached.any():
+            break
+
+        hops[reached] = level
+        if predecessors:
+            # The predecessor is the first vertex of the frontier with an edge to the reached vertex. The
+            # columns of the targets are taken as rows of the transpose, so both operands are (reached, n)
+            # with or without batch axes.
+            *batch, source, target = np.nonzero(reached)
+            before = frontier[(*batch, source)] & incoming[(*batch, target)]
+            previous[reached] = np.argmax(before, axis=-1)
+
+        visited |= reached
+        frontier = reached
+
+    if predecessors:
+        return hops, previous
+    return hops
+
+def hop_path(previous, i, j):
+    """
+        This method rebuilds a path from the predecessor matrix returned by hop_distances.
+
+        param previous: The predecessor matrix of a graph.
+        param i: The index of the initial vertex.
+        param j: The index of the goal vertex.
+        return: The list of vertex indices from i to j, or None if there is no a path.
+    """
+
+    if i != j and previous[i][j] == -1:
+        return None
+
+    path = [j]
+    while path[-1] != i:
+        path.append(int(previous[i][path[-1]]))
+    path.reverse()
+    return path
+
+#------------------------------------------------------------------------------------------------------------------
+#   Floyd-Marshall algorithm
+#------------------------------------------------------------------------------------------------------------------
+
+def floyd_marshall(adjacency_matrix):
+    """
+        This method finds the length of the shortest paths between all the vertices
+        of a graph. Each pivot k relaxes the whole matrix at once with NumPy.
+
+        param adjacency_matrix: The adjacency matrix of the graph, where 0 means that there is no edge.
+        return: A tuple (distances, next_hop). distances is a float matrix with the length of the shortest
+        paths between vertices of the graph, or np.inf if there is no path. next_hop[i][j] is the vertex
+        that follows i in the shortest path from i to j, or -1 if there is no path.
+    """
+
+    distances = _initial_distances(adjacency_matrix)
+    n = distances.shape[-1]
+    next_hop = np.where(np.isfinite(distances), np.arange(n), -1)
+
+    for k in range(n):
+        through_k = distances[:, k, None] + distances[None, k, :]
+        better = through_k < distances
+        np.minimum(distances, through_k, out=distances)
+        next_hop = np.where(better, next_hop[:, k, None], next_hop)
+
+    return distances, next_hop
+
+def floyd_marshall_batch(weights):
+    """
+        This method finds the length of the shortest paths between all the vertices of a stack of graphs,
+        for example a (subjects x tasks x n x n) tensor with every task matrix of a cohort. All the graphs
+        are relaxed together, so each pivot k is a single NumPy operation over the whole batch.
+
+        param weights: An array of shape (..., n, n) with the adjacency matrices of the graphs, where 0
+        means that there is no edge.
+        return: A float array with the same shape as weights, with the length of the shortest paths
+        between vertices of each graph, or np.inf if there is no path.
+    """
+
+    return _relax_all(_initial_distances(weights))
+
+def _relax_all(distances):
+    """
+        This method relaxes initial distance matrices through every pivot k, in place.
+    """
+
+    n = distances.shape[-1]
+    for k in range(n):
+        np.minimum(distances, distances[..., :, k, None] + distances[..., None, k, :], out=distances)
+    return distances
+
+def _initial_distances(weights):
+    """
+        This method converts adjacency matrices to the initial distance matrices of Floyd-Marshall: missing
+        edges are np.inf and the diagonal is 0.
+    """
+
+    distances = np.array(weights, dtype=np.float64)
+    n = distances.shape[-1]
+
+    # Missing edges have an infinite length
+    distances[distances == 0] = np.inf
+    distances[..., np.arange(n), np.arange(n)] = 0
+    return distances
+
+def floyd_path(next_hop, i, j):
+    """
+        This method rebuilds a shortest path from the next-hop matrix returned by floyd_marshall.
+
+        param next_hop: The next-hop matrix.
+        param i: The index of the initial vertex.
+        param j: The index of the goal vertex.
+        return: The list of vertex indices from i to j, or None if there is no a path.
+    """
+
+    if next_hop[i][j] == -1:
+        return None
+
+    path = [i]
+    while i != j:
+        i = int(next_hop[i][j])
+        path.append(i)
+    return path
+
+#------------------------------------------------------------------------------------------------------------------
+#   Dynamic all-pairs distances
+#------------------------------------------------------------------------------------------------------------------
+class DynamicDistances:
+    """
+        Class that is used to keep the length of the shortest paths between all the vertices of a graph
+        while its edges change. The distances are computed once with Floyd-Marshall and then updated in
+        place:
+        * When an edge is inserted, or a lighter edge is added between two vertices, every pair is relaxed
+          through the new edge in O(n²).
+        * When an edge is removed, only the rows of the sources whose shortest paths used the edge are
+          computed again, with one Dijkstra search from all of them at once.
+
+        The graph creates and updates the object, see WeightedGraph.dynamic_distances.
+    """
+
+    def __init__(self, graph):
+        """
+            This constructor computes the distances between all the vertices of a graph.
+
+            param graph: The graph whose distances are kept.
+        """
+
+        self._graph = graph
+        n = graph.number_of_vertices()
+
+        # Lightest edge between every pair of vertices, np.inf if there is no edge
+        indptr, indices, weights = graph.csr()
+        self._weights = np.full((n, n), np.inf)
+        np.minimum.at(self._weights, (np.repeat(np.arange(n), np.diff(indptr)), indices), weights)
+
+        self._distances = self._all_distances()
+
+    def distances(self):
+        """
+            This method returns the matrix with the length of the shortest paths between the vertices of
+            the graph, or np.inf if there is no path. The matrix is a read-only view that is updated with
+            the graph.
+        """
+
+        view = self._distances.view()
+        view.flags.writeable = False
+        return view
+
+    def distance(self, vi, vg):
+        """
+            This method returns the length of the shortest path from vi to vg.
+
+            param vi: The initial vertex.
+            param vg: The goal vertex.
+            return: The length of the path, np.inf if there is no path, or None if a vertex does not exist.
+        """
+
+        if not _check_vertices(self._graph, vi, vg):
+            return None
+        return float(self._distances[self._graph.vertex_index(vi), self._graph.vertex_index(vg)])
+
+    def insert(self, i, j, e):
+        """
+            This method updates the distances after the edge (i, j, e) is added to the graph.
+
+            param i: The row index of the start vertex of the edge.
+            param j: The row index of the end vertex of the edge.
+            param e: The weight of the edge.
+        """
+
+        if e >= self._weights[i, j]:
+            # There is already a lighter edge between the two vertices.
+            return
+
+        distances = self._distances
+        self._weights[i, j] = e
+        np.minimum(distances, distances[:, i, None] + e + distances[None, j, :], out=distances)
+
+        if not self._graph.is_directed():
+            self._weights[j, i] = e
+            np.minimum(distances, distances[:, j, None] + e + distances[None, i, :], out=distances)
+
+    def delete(self, i, j, e):
+        """
+            This method updates the distances after the edge (i, j, e) is removed from the graph.
+
+            param i: The row index of the start vertex of the edge.
+            param j: The row index of the end vertex of the edge.
+            param e: The weight of the edge.
+        """
+
+        # Lightest of the edges that are left between the two vertices
+        weight = min([w for k, w in self._graph._row_edges(i) if k == j], default=np.inf)
+        old = self._weights[i, j]
+        if weight == old:
+            return
+
+        directed = self._graph.is_directed()
+        distances = self._distances
+
+        # Sources with a shortest path that goes through the edge
+        through = distances[:, i, None] + old + distances[None, j, :]
+        affected = np.any(np.isfinite(through) & np.isclose(through, distances, rtol=1e-9, atol=0), axis=1)
+        if not directed:
+            through = distances[:, j, None] + old + distances[None, i, :]
+            affected |= np.any(np.isfinite(through) & np.isclose(through, distances, rtol=1e-9, atol=0), axis=1)
+
+        self._weights[i, j] = weight
+        if not directed:
+            self._weights[j, i] = weight
+
+        sources = np.flatnonzero(affected)
+        if 2 * len(sources) > len(distances):
+            # Most of the rows changed, so all of them are computed again.
+            self._distances = self._all_distances()
+        elif len(sources):
+            distances[sources] = _dense_dijkstra(self._weights, sources)
+            if not directed:
+                distances[:, sources] = distances[sources].T
+
+    def add_vertex(self):
+        """
+            This method adds an isolated vertex, after a vertex is added to the graph.
+        """
+
+        n = len(self._distances)
+        for name in ("_weights", "_distances"):
+            matrix = np.full((n + 1, n + 1), np.inf)
+            matrix[:n, :n] = getattr(self, name)
+            setattr(self, name, matrix)
+        self._distances[n, n] = 0
+
+    def _all_distances(self):
+        """
+            This method computes the distances between all the vertices with Floyd-Marshall. It starts from
+            the weight matrix, where np.inf means that there is no edge, so an edge of weight 0 is a real
+            edge here, as it is for insert and delete.
+        """
+
+        distances = self._weights.copy()
+        np.fill_diagonal(distances, 0)
+        return _relax_all(distances)
+
+def _dense_dijkstra(weights, sources):
+    """
+        This method returns the length of the shortest paths from each source to every vertex of a graph
+        given by a dense weight matrix, where np.inf means that there is no edge. All the sources are
+        searched together: each step settles the closest vertex of every search and relaxes its row with
+        one NumPy operation.
+    """
+
+    n = len(weights)
+    rows = np.arange(len(sources))
+    distances = np.full((len(sources), n), np.inf)
+    distances[rows, sources] = 0
+    unsettled = np.ones((len(sources), n), dtype=bool)
+
+    for _ in range(n):
+        candidates = np.where(unsettled, distances, np.inf)
+        closest = np.argmin(candidates, axis=1)
+        if np.all(candidates[rows, closest] == np.inf):
+            break
+        unsettled[rows, closest] = False
+        np.minimum(distances, distances[rows, closest, None] + weights[closest], out=distances)
+
+    return distances
@@ -0,0 +1,104 @@
+import numpy as np
+
+from scipy.spatial import Voronoi
+
+# Clipped cells of the montages that were already tessellated, by points and boundary
+_cells_cache = {}
+
+#------------------------------------------------------------------------------------------------------------------
+#   Bounded Voronoi cells
+#------------------------------------------------------------------------------------------------------------------
+
+def voronoi_cells(points2D, boundary = None):
+    """
+        This method finds the Voronoi cell of every electrode, clipped to the outline of the head, so the
+        outer electrodes also get a closed cell. The electrode positions are fixed for each montage, so
+        the cells are computed once per montage and boundary, and later calls return the cached cells.
+
+        param points2D: An array of n (x, y) electrode positions.
+        param boundary: A convex polygon, as an array of (x, y) vertices in counterclockwise order, or None
+                        to use head_boundary(points2D).
+        return: A list with the cell of each electrode, in the order of points2D. Each cell is an array of
+        (x, y) vertices in counterclockwise order, which is empty if the electrode is out of the boundary.
+    """
+
+    points2D = np.ascontiguousarray(points2D, dtype=np.float64)
+    boundary = head_boundary(points2D) if boundary is None else np.ascontiguousarray(boundary, dtype=np.float64)
+
+    key = (points2D.shape, points2D.tobytes(), boundary.tobytes())
+    if key not in _cells_cache:
+        _cells_cache[key] = _clipped_cells(points2D, boundary)
+    return [cell.copy() for cell in _cells_cache[key]]
+
+def head_boundary(points2D, margin = 1.1, segments = 128):
+    """
+        This method returns a disk around the electrodes as a polygon, which is the default boundary of the
+        Voronoi cells.
+
+        param points2D: An array of n (x, y) electrode positions.
+        param margin: The radius of the disk divided by the distance of the farthest electrode from the
+                      origin.
+        param segments: The number of sides of the polygon.
+        return: The array of (x, y) vertices of the polygon, in counterclockwise order.
+    """
+
+    radius = margin * np.max(np.hypot(points2D[:, 0], points2D[:, 1]))
+    angles = np.linspace(0, 2 * np.pi, segments, endpoint=False)
+    return np.column_stack((radius * np.cos(angles), radius * np.sin(angles)))
+
+def _clipped_cells(points2D, boundary):
+    """
+        This method computes the Voronoi cells of the points clipped to the boundary. The cell of point i
+        is the boundary cut by the bisector of i and every Voronoi neighbor of i, so the cells do not
+        depend on the unbounded regions of the diagram.
+    """
+
+    n = len(points2D)
+    neighbors = [[] for _ in range(n)]
+    if n > 2:
+        for i, j in Voronoi(points2D).ridge_points.tolist():
+            neighbors[i].append(j)
+            neighbors[j].append(i)
+    else:
+        # Too few points for a tessellation, every point is a neighbor of the others
+        neighbors = [[j for j in range(n) if j != i] for i in range(n)]
+
+    cells = []
+    for i in range(n):
+        cell = boundary
+        for j in neighbors[i]:
+            # Keep the side of the bisector that is closer to point i
+            normal = points2D[j] - points2D[i]
+            offset = normal @ (points2D[i] + points2D[j]) / 2
+            cell = _clip(cell, normal, offset)
+        cells.append(cell)
+    return cells
+
+def _clip(polygon, normal, offset):
+    """
+        This method clips a convex polygon to the half-plane normal · p <= offset.
+    """
+
+    if not len(polygon):
+        return polygon
+
+    side = polygon @ normal - offset
+    inside = side <= 0
+    if inside.all():
+        return polygon
+    if not inside.any():
+        return polygon[:0]
+
+    # Edges from each vertex to the next one that cross the line
+    following = np.roll(polygon, -1, axis=0)
+    crossing = inside != np.roll(inside, -1)
+    t = side[crossing] / (side[crossing] - np.roll(side, -1)[crossing])
+    points = polygon[crossing] + t[:, None] * (following[crossing] - polygon[crossing])
+
+    # Each vertex is followed by the crossing point of its edge, if there is one
+    counts = inside.astype(np.int64) + crossing
+    positions = np.cumsum(counts) - counts
+    clipped = np.empty((counts.sum(), 2))
+    clipped[positions[inside]] = polygon[inside]
+    clipped[positions[crossing] + inside[crossing]] = points
+    return clipped